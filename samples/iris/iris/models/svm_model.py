@@ -1,40 +1,187 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
 from iris.data_processing import EmptyProcessor
 from iris.models import BaseModel
 from sklearn import svm
+from sklearn.metrics.pairwise import pairwise_kernels
 
 
 class IrisSVMModel(BaseModel):
     """
     sklearn SVM model wrapper
+    The projected and preprocessed features of each input object are cached as a
+    C-contiguous float64 array (the layout sklearn works on), so repeated calls to fit/predict
+    with the same input (e.g. in hyper parameter sweeps) don't copy the data again.
+    Inputs are assumed not to be modified in place between calls.
+    With precompute_kernel, the SVC is trained on a precomputed kernel matrix, and the kernel matrices
+    of the training and test sets are cached per kernel configuration and data, across model instances,
+    so that sweeping C or class_weight for a fixed kernel computes each kernel matrix once.
     """
 
+    # Number of input objects to keep features for
+    features_cache_size = 4
+    # Number of kernel matrices to keep, shared by all models in the process
+    kernel_cache_size = 8
+    _kernel_cache = OrderedDict()
+
     def __init__(
-        self, features, kernel="linear", label="Species", preprocessor=EmptyProcessor()
+        self,
+        features,
+        kernel="linear",
+        label="Species",
+        preprocessor=EmptyProcessor(),
+        C=1.0,
+        class_weight=None,
+        precompute_kernel=False,
     ):
+        """
+        :param features: Names of the feature columns
+        :param kernel: SVC kernel: linear, poly, rbf or sigmoid (with the SVC defaults for gamma, degree and coef0)
+        :param label: Name of the label column
+        :param preprocessor: Preprocessor applied on the features
+        :param C: SVC regularization parameter
+        :param class_weight: SVC class weights
+        :param precompute_kernel: Whether to train on a cached precomputed kernel matrix
+        """
         self.features = features
         self.kernel = kernel
+        self.C = C
+        self.class_weight = class_weight
+        self.precompute_kernel = precompute_kernel
         self.model = None
+        self.kernel_cache_hits = 0
+        self.kernel_cache_misses = 0
+        self._features_cache = OrderedDict()
+        self._train_features = None
+        self._kernel_params = None
 
         super().__init__(
-            features=features, label=label, kernel=kernel, preprocessor=preprocessor
+            features=features,
+            label=label,
+            kernel=kernel,
+            preprocessor=preprocessor,
+            C=C,
+            class_weight=class_weight,
+            precompute_kernel=precompute_kernel,
         )
 
     def fit(self, X, y=None) -> None:
-        train_X = X[self.features]
+        train_X_processed = self.get_features(X)
         train_y = y
 
-        train_X_processed = self.preprocessor.apply_batch(train_X)
-
         print("Fitting model")
-        self.model = svm.SVC(kernel=self.kernel)
-        self.model.fit(train_X_processed, train_y)
+        if self.precompute_kernel:
+            self._train_features = train_X_processed
+            self._kernel_params = self.get_kernel_params(train_X_processed)
+            self.model = svm.SVC(kernel="precomputed", C=self.C, class_weight=self.class_weight)
+            self.model.fit(self.get_kernel(train_X_processed), train_y)
+        else:
+            self.model = svm.SVC(kernel=self.kernel, C=self.C, class_weight=self.class_weight)
+            self.model.fit(train_X_processed, train_y)
         print(f"Finished fitting model {self.model}")
 
     def predict(self, X):
-        test_X = X[self.features]
-        test_X_processed = self.preprocessor.apply_batch(test_X)
+        test_X_processed = self.get_features(X)
+        if self.precompute_kernel:
+            # Kernel rows between the test samples and all the training samples
+            test_X_processed = self.get_kernel(test_X_processed)
 
-        print(f"Predicting on {len(test_X)} samples")
+        print(f"Predicting on {len(test_X_processed)} samples")
         predictions = self.model.predict(test_X_processed)
         print(f"Finished prediction")
         return predictions
+
+    def get_features(self, X) -> np.ndarray:
+        """
+        Returns the projected and preprocessed features of X as a C-contiguous float64 array,
+        computing them only on the first call for this X object
+        :param X: DataFrame holding (at least) the model's features
+        """
+        key = id(X)
+        cached = self._features_cache.get(key)
+        if cached is not None and cached[0]() is X:
+            self._features_cache.move_to_end(key)
+            return cached[1]
+
+        X_processed = self.preprocessor.apply_batch(X[self.features])
+        X_features = np.ascontiguousarray(X_processed, dtype=np.float64)
+        X_features.flags.writeable = False
+
+        try:
+            self._features_cache[key] = (weakref.ref(X), X_features)
+        except TypeError:
+            # Object doesn't support weak references, skip caching
+            return X_features
+        while len(self._features_cache) > self.features_cache_size:
+            self._features_cache.popitem(last=False)
+        return X_features
+
+    def get_kernel_params(self, X: np.ndarray) -> Dict:
+        """
+        Returns the kernel parameters SVC would use when fitted on X (gamma="scale", degree=3, coef0=0)
+        """
+        if self.kernel == "linear":
+            return {}
+        X_var = X.var()
+        params = {"gamma": 1.0 / (X.shape[1] * X_var) if X_var != 0 else 1.0}
+        if self.kernel == "poly":
+            params.update(degree=3, coef0=0.0)
+        elif self.kernel == "sigmoid":
+            params.update(coef0=0.0)
+        return params
+
+    def get_kernel(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the kernel matrix between the rows of X and the training set,
+        computing it only once per kernel configuration, X and training set
+        :param X: Features of the training or test set
+        """
+        key = (
+            self.kernel,
+            tuple(sorted(self._kernel_params.items())),
+            fingerprint(X),
+            fingerprint(self._train_features),
+        )
+        kernel_cache = IrisSVMModel._kernel_cache
+        if key in kernel_cache:
+            self.kernel_cache_hits += 1
+            kernel_cache.move_to_end(key)
+            return kernel_cache[key]
+
+        self.kernel_cache_misses += 1
+        kernel = np.ascontiguousarray(
+            pairwise_kernels(X, self._train_features, metric=self.kernel, **self._kernel_params),
+            dtype=np.float64,
+        )
+        kernel.flags.writeable = False
+        kernel_cache[key] = kernel
+        while len(kernel_cache) > self.kernel_cache_size:
+            kernel_cache.popitem(last=False)
+        return kernel
+
+    def get_metrics(self):
+        if not self.precompute_kernel:
+            return super().get_metrics()
+        return {
+            "kernel_cache_hits": self.kernel_cache_hits,
+            "kernel_cache_misses": self.kernel_cache_misses,
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_features_cache"] = OrderedDict()
+        return state
+
+
+def fingerprint(X: np.ndarray) -> str:
+    """
+    Returns a hash of the shape and contents of a features array
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(X.shape).encode("utf-8"))
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,75 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from iris.models import IrisSVMModel
+
+FEATURES = ["SepalLengthCm", "PetalLengthCm"]
+
+
+def make_dataset():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        {
+            "SepalLengthCm": np.r_[rng.normal(5, 0.2, 20), rng.normal(7, 0.2, 20)],
+            "SepalWidthCm": rng.normal(3, 0.2, 40),
+            "PetalLengthCm": np.r_[rng.normal(1.5, 0.2, 20), rng.normal(5, 0.2, 20)],
+        }
+    )
+    y = pd.Series(["Iris-setosa"] * 20 + ["Iris-virginica"] * 20)
+    return X, y
+
+
+def test_features_are_cached_per_input_object():
+    X, y = make_dataset()
+    model = IrisSVMModel(features=FEATURES)
+
+    features = model.get_features(X)
+
+    assert features.flags["C_CONTIGUOUS"]
+    assert features.dtype == np.float64
+    assert features.shape == (40, 2)
+    assert model.get_features(X) is features
+    assert model.get_features(X.copy()) is not features
+
+
+def test_fit_predict_and_pickle():
+    X, y = make_dataset()
+    model = IrisSVMModel(features=FEATURES)
+    model.fit(X, y)
+    model.fit(X, y)
+
+    assert (model.predict(X) == y).all()
+    loaded = pickle.loads(pickle.dumps(model))
+    assert (loaded.predict(X) == y).all()
+
+
+@pytest.mark.parametrize("kernel", ["linear", "rbf", "poly", "sigmoid"])
+def test_precomputed_kernel_matches_svc_kernel(kernel):
+    X, y = make_dataset()
+    X_test = X.iloc[::3].reset_index(drop=True)
+    model = IrisSVMModel(features=FEATURES, kernel=kernel)
+    model.fit(X, y)
+    precomputed = IrisSVMModel(features=FEATURES, kernel=kernel, precompute_kernel=True)
+    precomputed.fit(X, y)
+
+    assert precomputed.model.kernel == "precomputed"
+    assert (precomputed.predict(X_test) == model.predict(X_test)).all()
+    assert np.allclose(precomputed.model.dual_coef_, model.model.dual_coef_)
+
+
+def test_kernel_matrices_are_reused_across_trials():
+    X, y = make_dataset()
+    X_test = X.iloc[::3].reset_index(drop=True)
+    for C in (0.1, 1.0, 10.0):
+        model = IrisSVMModel(features=FEATURES, kernel="rbf", C=C, precompute_kernel=True)
+        model.fit(X.copy(), y)
+        model.predict(X_test.copy())
+
+    assert model.get_metrics() == {"kernel_cache_hits": 2, "kernel_cache_misses": 0}
+    assert model.get_params()["C"] == 10.0
+
+    loaded = pickle.loads(pickle.dumps(model))
+    assert (loaded.predict(X_test) == model.predict(X_test)).all()
@@ -1,4 +1,5 @@
 from .data_loader import DataLoader
+from .gold_labels import GoldLabels
 from .conll_data_loader import ConllDataLoader
 
-__all__ = ["DataLoader", "ConllDataLoader"]
+__all__ = ["DataLoader", "GoldLabels", "ConllDataLoader"]
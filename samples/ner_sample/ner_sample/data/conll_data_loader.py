@@ -1,4 +1,3 @@
-import copy
 from pathlib import Path
 from typing import Tuple
 
@@ -6,6 +5,7 @@ import requests
 from flair.datasets import CONLL_03
 
 from ner_sample.data import DataLoader
+from ner_sample.data.gold_labels import GoldLabels
 
 
 class ConllDataLoader(DataLoader):
@@ -21,11 +21,14 @@ class ConllDataLoader(DataLoader):
         Data Loader for the CONLL 03 dataset.
         download_dataset downloads the three datasets (train, testa and testb) from Github
         get_dataset returns a flair Corpus object holding the three datasets.
+        The gold labels of the test set are stored in gold_labels (a GoldLabels object),
+        to be passed as y_test to the evaluator.
         """
         self.folds = ("eng.train", "eng.testa", "eng.testb")
         self.local_data_path = local_data_path
         self.dataset_path = dataset_path
         self.downsample = downsample
+        self.gold_labels = None
         super().__init__(dataset_name=dataset_name, dataset_version=dataset_version, downsample=downsample)
 
     def download_dataset(self) -> None:
@@ -64,12 +67,10 @@ class ConllDataLoader(DataLoader):
 
             test = corpus.test
 
-            # Copy labels to a new tag (Flair overrides the ner tag during prediction)
+            # Keep gold labels aside (Flair overrides the ner tag during prediction)
+            self.gold_labels = GoldLabels.from_sentences(test, tag_type="ner")
             for sentence in test:
                 for token in sentence.tokens:
-                    token.annotation_layers["gold_ner"] = copy.deepcopy(
-                        token.annotation_layers["ner"]
-                    )
                     token.annotation_layers["ner"][0].value = "O"
 
             return train, test
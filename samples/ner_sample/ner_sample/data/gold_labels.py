@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class GoldLabels:
+    """
+    Compact, array-backed store of the gold tags of a list of sentences.
+    Tags of sentence i are tag_ids[offsets[i]:offsets[i + 1]], encoded using tag_names.
+    Used for keeping the gold labels next to the corpus, instead of copying
+    an annotation layer into every token.
+    :param offsets: Array of length n_sentences + 1 with the start offset of each sentence
+    :param tag_ids: Array with the tag id of each token
+    :param tag_names: Tag name of each tag id
+    """
+
+    def __init__(self, offsets: np.ndarray, tag_ids: np.ndarray, tag_names: List[str]):
+        self.offsets = offsets
+        self.tag_ids = tag_ids
+        self.tag_names = tag_names
+
+    @classmethod
+    def from_sentences(cls, sentences: Iterable, tag_type: str = "ner") -> "GoldLabels":
+        """
+        Creates a GoldLabels store from the current tags of the given sentences
+        :param sentences: Iterable of flair Sentence objects
+        :param tag_type: Annotation layer to read the tags from
+        :return: GoldLabels
+        """
+        tag_index: Dict[str, int] = {}
+        offsets = [0]
+        tag_ids = []
+        for sentence in sentences:
+            for token in sentence.tokens:
+                tag = token.annotation_layers[tag_type][0].value
+                tag_ids.append(tag_index.setdefault(tag, len(tag_index)))
+            offsets.append(len(tag_ids))
+
+        return cls(
+            offsets=np.asarray(offsets, dtype=np.int64),
+            tag_ids=np.asarray(tag_ids, dtype=np.int32),
+            tag_names=list(tag_index),
+        )
+
+    def get_tag_ids(self, index: int) -> np.ndarray:
+        """
+        Returns a view over the tag ids of one sentence
+        :param index: Sentence index
+        """
+        return self.tag_ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_tags(self, index: int) -> List[str]:
+        """
+        Returns the tag names of one sentence
+        :param index: Sentence index
+        """
+        return [self.tag_names[tag_id] for tag_id in self.get_tag_ids(index)]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.get_tags(index)
+
+    def __repr__(self):
+        return f"GoldLabels: {len(self)} sentences, {len(self.tag_ids)} tokens"
@@ -1,21 +1,29 @@
 from seqeval.metrics import f1_score, accuracy_score
 
+from ner_sample.data.gold_labels import GoldLabels
 from ner_sample.evaluation import Evaluator, NEREvaluationMetrics
 
 
 class NEREvaluator(Evaluator):
     """
     This class holds the logic for evaluating a prediction outcome
-    y_test in our case is None
+    y_test in our case is the GoldLabels store created by ConllDataLoader.get_dataset
     """
 
-    def evaluate(self, y_test, predictions) -> NEREvaluationMetrics:
+    def evaluate(self, y_test: GoldLabels, predictions) -> NEREvaluationMetrics:
+        if y_test is None:
+            raise ValueError(
+                "Gold labels not passed, use y_test=data_loader.gold_labels"
+            )
+        if len(y_test) != len(predictions):
+            raise ValueError(
+                f"Number of predicted sentences ({len(predictions)}) "
+                f"does not match number of gold sentences ({len(y_test)})"
+            )
 
-        golds = []
+        golds = list(y_test)
         predicted = []
         for sentence in predictions:
-            gold_tags = [token.get_tag("gold_ner").value for token in sentence.tokens]
-            golds.append(gold_tags)
             predicted_tags = [token.get_tag("ner").value for token in sentence.tokens]
             predicted.append(predicted_tags)
 
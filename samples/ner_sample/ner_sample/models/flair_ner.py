@@ -23,12 +23,14 @@ class FlairNERModel(BaseModel):
         word_embeddings: str = "glove",
         train_with_dev: bool = True,
         max_epochs: int = 10,
+        mini_batch_size: int = 32,
     ):
         """
         NER detector using the Flair NLP package.
         Source: https://github.com/flairNLP/flair/blob/master/resources/docs/EXPERIMENTS.md
         All class inputs (except for the corpus) are model hyper parameters.
         They are then directed to the base class and get logged into the experiment logger
+        :param mini_batch_size: Number of sentences tagged together in predict
         """
         self.tag_type = "ner"
         self.tag_dictionary = None
@@ -40,6 +42,7 @@ class FlairNERModel(BaseModel):
         self.word_embeddings = word_embeddings
         self.train_with_dev = train_with_dev
         self.max_epochs = max_epochs
+        self.mini_batch_size = mini_batch_size
 
         self.set_tagger_definition(corpus)
 
@@ -49,6 +52,7 @@ class FlairNERModel(BaseModel):
             word_embeddings=word_embeddings,
             train_with_dev=train_with_dev,
             max_epochs=max_epochs,
+            mini_batch_size=mini_batch_size,
         )
 
         super().__init__(**hyper_params)
@@ -64,10 +68,23 @@ class FlairNERModel(BaseModel):
         )
 
     def predict(self, X):
-        tagged_sentences = []
-        for sentence in tqdm(X):
-            self.tagger.predict(sentence)
-            tagged_sentences.append(sentence)
+        """
+        Tags sentences in mini batches of sentences of similar lengths, to minimize padding.
+        Sentences are tagged in place and returned in their original order.
+        Embeddings are cleared after each mini batch, so memory doesn't grow with the number of sentences.
+        :param X: Sentences to tag
+        :return: The tagged sentences
+        """
+        tagged_sentences = list(X)
+        by_length = sorted(tagged_sentences, key=len, reverse=True)
+        with tqdm(total=len(by_length)) as progress:
+            for start in range(0, len(by_length), self.mini_batch_size):
+                mini_batch = by_length[start:start + self.mini_batch_size]
+                self.tagger.predict(mini_batch, mini_batch_size=self.mini_batch_size,
+                                    embedding_storage_mode="none")
+                for sentence in mini_batch:
+                    sentence.clear_embeddings()
+                progress.update(len(mini_batch))
         print(f"Tagged {len(tagged_sentences)} sentences")
         return tagged_sentences
 
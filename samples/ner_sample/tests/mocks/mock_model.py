@@ -1,11 +1,11 @@
-import copy
-
+from ner_sample.data import GoldLabels
 from ner_sample.models import BaseModel
 
 
 class MockModel(BaseModel):
-    def __init__(self, model_name=None, **hyper_params):
+    def __init__(self, model_name=None, gold_labels: GoldLabels = None, **hyper_params):
         self.x = None
+        self.gold_labels = gold_labels
         super().__init__(model_name=model_name, **hyper_params)
 
     def fit(self, X, y=None) -> None:
@@ -16,15 +16,11 @@ class MockModel(BaseModel):
         Predict the label with some noise (mock model)
         """
         counter = 0
-        for sentence in X:
-            for token in sentence.tokens:
-                # use original labels:
-                token.annotation_layers["ner"] = copy.deepcopy(
-                    token.annotation_layers["gold_ner"]
-                )
-                # revert some to "O":
-                if counter % 3 == 0:
-                    token.annotation_layers["ner"][0].value = "O"
+        for i, sentence in enumerate(X):
+            gold_tags = self.gold_labels.get_tags(i)
+            for token, gold_tag in zip(sentence.tokens, gold_tags):
+                # use original labels, revert some to "O":
+                token.annotation_layers["ner"][0].value = "O" if counter % 3 == 0 else gold_tag
                 counter += 1
 
         return X
@@ -17,13 +17,16 @@ def test_experiment_runner():
     assert train is not None
     assert test is not None
 
-    model = MockModel(model_name="Mock", param1="hello", param2="world")
+    model = MockModel(
+        model_name="Mock", gold_labels=data_loader.gold_labels, param1="hello", param2="world"
+    )
     evaluator = NEREvaluator()
     experiment_logger = MockExperimentation()
     experiment_runner = ExperimentRunner(
         model=model,
         X_train=train,
         X_test=test,
+        y_test=data_loader.gold_labels,
         data_loader=data_loader,
         evaluator=evaluator,
         experiment_logger=experiment_logger,
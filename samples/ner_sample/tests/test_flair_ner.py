@@ -29,12 +29,29 @@ def test_flair_inference_correct(
 
     tp_count = 0
     total_count = 0
-    for sentence, prediction in zip(test, predictions):
-        for i in range(len(sentence.tokens)):
+    for j, prediction in enumerate(predictions):
+        gold_tags = dataset_loader.gold_labels.get_tags(j)
+        for i in range(len(prediction.tokens)):
             pred = prediction.tokens[i].annotation_layers["ner"][0].value
-            actual = sentence.tokens[i].annotation_layers["gold_ner"][0].value
+            actual = gold_tags[i]
             if pred == actual:
                 tp_count += 1
             total_count += 1
 
     assert float(tp_count) / total_count > 0.7
+
+
+def test_flair_batched_inference_matches_sentence_by_sentence(
+    pretrained_model: FlairNERModel, dataset_loader: MockDataLoader
+):
+    def predicted_tags(mini_batch_size):
+        _, test = dataset_loader.get_dataset()
+        pretrained_model.mini_batch_size = mini_batch_size
+        predictions = pretrained_model.predict(test)
+        return [
+            [token.annotation_layers["ner"][0].value for token in prediction.tokens]
+            for prediction in predictions
+        ]
+
+    expected = predicted_tags(mini_batch_size=1)
+    assert predicted_tags(mini_batch_size=8) == expected
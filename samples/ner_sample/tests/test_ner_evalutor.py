@@ -1,5 +1,3 @@
-import copy
-
 import pytest
 
 from ner_sample.evaluation import NEREvaluator
@@ -8,18 +6,26 @@ from tests.mocks import MockDataLoader
 
 def test_ner_evaluator_mock_data(dataset_loader: MockDataLoader):
     corpus, test = dataset_loader.get_dataset()
+    gold_labels = dataset_loader.gold_labels
 
     # replace some tags to validate evaluation
     counter = 0
-    for sentence in test:
-        for token in sentence.tokens:
+    for i, sentence in enumerate(test):
+        for token, gold_tag in zip(sentence.tokens, gold_labels.get_tags(i)):
             # "predict" the actual labels, and add some noise
-            token.annotation_layers["ner"] = copy.deepcopy(token.annotation_layers["gold_ner"])
+            token.annotation_layers["ner"][0].value = gold_tag
             if counter % 3 == 0:
                 token.annotation_layers["ner"][0].value = 'O'
             counter += 1
 
     evaluator = NEREvaluator()
-    ner_evaluation_metrics = evaluator.evaluate(y_test=None, predictions=test)
+    ner_evaluation_metrics = evaluator.evaluate(y_test=gold_labels, predictions=test)
     assert ner_evaluation_metrics.f1 == pytest.approx(0.4, 0.1)
     assert ner_evaluation_metrics.accuracy == pytest.approx(0.9, 0.1)
+
+
+def test_ner_evaluator_requires_gold_labels(dataset_loader: MockDataLoader):
+    _, test = dataset_loader.get_dataset()
+
+    with pytest.raises(ValueError):
+        NEREvaluator().evaluate(y_test=None, predictions=test)
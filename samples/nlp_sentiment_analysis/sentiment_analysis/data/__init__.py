@@ -1,4 +1,6 @@
+from .sampling import SamplingSpec
+from .dataset_cache import DatasetCache, dataset_cache
 from .data_loader import DataLoader
 from .nlp_sample_data_loader import NLPSampleDataLoader
 
-__all__ = ['DataLoader', "NLPSampleDataLoader"]
+__all__ = ['DataLoader', "NLPSampleDataLoader", "SamplingSpec", "DatasetCache", "dataset_cache"]
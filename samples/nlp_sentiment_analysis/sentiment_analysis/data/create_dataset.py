@@ -2,53 +2,74 @@
 # sample is taken from here: https://towardsdatascience.com/building-a-sentiment-classifier-using-scikit-learn-54c8e7c5d2f0
 # the code is provided to play with nlp_sample and not part of framework
 
-import pandas as pd
-import re
-from os import system, listdir
+import os
+from concurrent.futures import ThreadPoolExecutor
+from os import listdir
 from os.path import isfile, join
-from random import shuffle
+from typing import List
+
+import pandas as pd
+
+# Number of files each worker thread reads before handing its results back
+CHUNK_SIZE = 1000
+# Rows per parquet row group, which is the unit of reading a shard of the dataset
+ROW_GROUP_SIZE = 1000
+
+
+def get_files(fld: str) -> list:
+    """
+    fld - positive or negative reviews folder
+    Returns: a list with all files in input folder
+    """
+    return [join(fld, f) for f in listdir(fld) if isfile(join(fld, f))]
 
 
-def create_data_frame(folder: str) -> pd.DataFrame:
+def read_chunk(files: List[str]) -> List[str]:
+    """
+    files - a chunk of review files
+    Returns: the contents of the files, in the same order
+    """
+    texts = []
+    for file_path in files:
+        with open(file_path, "r") as f:
+            texts.append(f.read())
+    return texts
+
+
+def read_files(files: List[str], n_workers: int = None, chunk_size: int = CHUNK_SIZE) -> List[str]:
+    """
+    Reads all files using a thread pool, each thread reading a chunk of files at a time.
+    files - list of files to read
+    n_workers - number of threads (default: ThreadPoolExecutor's default)
+    chunk_size - number of files per thread task
+    Returns: a list with the contents of each file, in the same order as 'files'
+    """
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    texts = []
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        for chunk_texts in executor.map(read_chunk, chunks):
+            texts.extend(chunk_texts)
+    return texts
+
+
+def create_data_frame(folder: str, n_workers: int = None, random_state: int = None) -> pd.DataFrame:
     """
     folder - the root folder of train or test dataset
+    n_workers - number of threads used for reading the review files
+    random_state - seed for shuffling the rows
     Returns: a DataFrame with the combined data from the input folder
     """
-    pos_folder = f"{folder}/pos"  # positive reviews
-    neg_folder = f"{folder}/neg"  # negative reviews
-
-    def get_files(fld: str) -> list:
-        """
-        fld - positive or negative reviews folder
-        Returns: a list with all files in input folder
-        """
-        return [join(fld, f) for f in listdir(fld) if isfile(join(fld, f))]
-
-    def append_files_data(data_list: list, files: list, label: int) -> None:
-        """
-        Appends to 'data_list' tuples of form (file content, label)
-        for each file in 'files' input list
-        """
-        for file_path in files:
-            with open(file_path, "r") as f:
-                text = f.read()
-                data_list.append((text, label))
-                print(".")
-
-    pos_files = get_files(pos_folder)
-    neg_files = get_files(neg_folder)
-
-    data_list = []
-    append_files_data(data_list, pos_files, 1)
-    append_files_data(data_list, neg_files, 0)
-    print("shuffle")
-    shuffle(data_list)
-
-    text, label = tuple(zip(*data_list))
+    pos_files = get_files(f"{folder}/pos")  # positive reviews
+    neg_files = get_files(f"{folder}/neg")  # negative reviews
+
+    text = pd.Series(read_files(pos_files + neg_files, n_workers=n_workers), dtype=object)
+    label = [1] * len(pos_files) + [0] * len(neg_files)
+
     # replacing line breaks with spaces
-    text = list(map(lambda txt: re.sub("(<br\s*/?>)+", " ", txt), text))
+    text = text.str.replace(r"(<br\s*/?>)+", " ", regex=True)
 
-    return pd.DataFrame({"text": text, "label": label})
+    df = pd.DataFrame({"text": text, "label": label})
+    return df.sample(frac=1, random_state=random_state).reset_index(drop=True)
 
 
 def main():
@@ -57,12 +78,9 @@ def main():
     print("test df")
     imdb_test = create_data_frame("aclImdb/test")
 
-    system("mkdir 'data'")
-    imdb_train.to_csv("data/raw/imdb_train.data", index=False)
-    imdb_test.to_csv("data/raw/imdb_test.data", index=False)
-
-    # imdb_train = pd.read_csv('data/imdb_train.data')
-    # imdb_test = pd.read_csv('data/imdb_test.data')
+    os.makedirs("data/raw", exist_ok=True)
+    imdb_train.to_parquet("data/raw/imdb_train.parquet", index=False, row_group_size=ROW_GROUP_SIZE)
+    imdb_test.to_parquet("data/raw/imdb_test.parquet", index=False, row_group_size=ROW_GROUP_SIZE)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,13 @@
 from abc import abstractmethod
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
 
 from sentiment_analysis import LoggableObject
+from sentiment_analysis.data.dataset_cache import dataset_cache
+from sentiment_analysis.data.sampling import SamplingSpec
+from sentiment_analysis.data.sharding import select_rows
 
 
 class DataLoader(LoggableObject):
@@ -12,11 +18,14 @@ class DataLoader(LoggableObject):
     Also, consider using the cookiecutter data-science data folders (external, interim, processed and raw)
     :param dataset_name: Name of dataset for reproducibility
     :param dataset_version: Version of dataset for reproducibility
+    :param sampling: Optional SamplingSpec, for loading a sample of the dataset
     """
 
-    def __init__(self, dataset_name, dataset_version, data_loader_name=None, **data_params):
+    def __init__(self, dataset_name, dataset_version, data_loader_name=None, sampling: SamplingSpec = None,
+                 **data_params):
         self.dataset_name = dataset_name
         self.dataset_version = dataset_version
+        self.sampling = sampling
         self.data_params = data_params
         super().__init__(name=data_loader_name)
 
@@ -39,6 +48,46 @@ class DataLoader(LoggableObject):
         """
         pass
 
+    def get_cached_dataset(self):
+        """
+        Loads the dataset through the process-wide dataset cache, so that loaders with the same class
+        and params (e.g. in multiple experiments of the same notebook) read and parse it only once.
+        Note that the cache key is based on get_params and get_data_files, so all parameters affecting
+        the loaded data should be logged there.
+        :return: A read-only view of the dataset object
+        """
+        return dataset_cache.get_dataset(self)
+
+    def get_data_files(self) -> List[str]:
+        """
+        Returns the files get_dataset reads. The dataset cache reloads the dataset when one of them changes.
+        By default, the files under the loader's data_path attribute (a file or a directory), if it has one
+        :return: List of file paths
+        """
+        data_path = getattr(self, "data_path", None)
+        if not data_path or not Path(data_path).exists():
+            return []
+        if Path(data_path).is_dir():
+            return sorted(str(path) for path in Path(data_path).rglob("*") if path.is_file())
+        return [str(data_path)]
+
+    def get_shard(self, shard_index: int, n_shards: int, strategy: str = "range"):
+        """
+        Loads one shard of the dataset, for running multiple workers on disjoint parts of the data.
+        Shards are deterministic: the same shard_index and n_shards always yield the same rows.
+        The row id is the row's position. By default, the whole dataset is loaded with get_dataset and each of
+        its parts (e.g. the train and test DataFrames) is sharded. Override in loaders that can read parts of
+        their files.
+        :param shard_index: Index of shard to load, in [0, n_shards)
+        :param n_shards: Total number of shards
+        :param strategy: "range" for contiguous ranges, "hash" for a stable hash of the row id
+        :return: The dataset object, holding only the rows of this shard
+        """
+        dataset = self.get_dataset()
+        if isinstance(dataset, tuple):
+            return tuple(_take_shard(part, shard_index, n_shards, strategy) for part in dataset)
+        return _take_shard(dataset, shard_index, n_shards, strategy)
+
     def get_params(self) -> Dict:
         """
         Reads the dataset loader configuration during experiment logging
@@ -53,8 +102,21 @@ class DataLoader(LoggableObject):
         if self.data_params:
             params.update(self.data_params)
 
+        if self.sampling:
+            params.update(self.sampling.get_params())
+
         return params
 
     def get_metrics(self):
         # Data loaders are not likely to contain metrics
         pass
+
+
+def _take_shard(data, shard_index: int, n_shards: int, strategy: str):
+    """
+    Returns the rows of a DataFrame, Series or array belonging to a shard
+    """
+    rows = select_rows(len(data), shard_index, n_shards, strategy)
+    if hasattr(data, "iloc"):
+        return data.iloc[rows].reset_index(drop=True)
+    return np.asarray(data)[rows]
@@ -0,0 +1,149 @@
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class DatasetCache:
+    """
+    In-process LRU cache of loaded datasets, shared by all DataLoader instances in the process
+    (e.g. all experiments of a notebook session).
+    Datasets are keyed by the loader class, its logged params (dataset_name, dataset_version, data_params
+    and sampling spec), and the resolved paths and modification times of the files it reads
+    (see DataLoader.get_data_files), so rewritten files or another data_path are loaded again.
+    Callers get read-only views: numpy arrays are marked as non writeable. pandas objects are returned
+    as shallow copies with copy-on-write (always on since pandas 3), so neither in-place writes nor adding,
+    replacing or dropping columns change the cached object. Without copy-on-write, they are deep copies.
+    :param max_bytes: Memory budget. The least recently used datasets are evicted when it is exceeded
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._datasets = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def get_dataset(self, data_loader):
+        """
+        Returns the dataset of data_loader from the cache, calling data_loader.get_dataset() on a miss
+        :param data_loader: DataLoader instance
+        :return: A read-only view of the dataset object
+        """
+        key = self.get_key(data_loader)
+        with self._lock:
+            if key in self._datasets:
+                self.hits += 1
+                self._datasets.move_to_end(key)
+                return read_only_view(self._datasets[key])
+
+            self.misses += 1
+            dataset = data_loader.get_dataset()
+            self._put(key, dataset)
+            return read_only_view(dataset)
+
+    @staticmethod
+    def get_key(data_loader):
+        loader_class = data_loader.__class__
+        params = data_loader.get_params() or {}
+        data_path = getattr(data_loader, "data_path", None)
+        return (
+            f"{loader_class.__module__}.{loader_class.__qualname__}",
+            repr(sorted(params.items(), key=lambda item: str(item[0]))),
+            os.path.realpath(data_path) if data_path else None,
+            tuple((os.path.realpath(path), os.stat(path).st_mtime_ns) for path in data_loader.get_data_files()),
+        )
+
+    def _put(self, key, dataset) -> None:
+        size = size_of(dataset)
+        if size > self.max_bytes:
+            logger.info(f"Dataset of size {size} bytes exceeds the cache budget ({self.max_bytes} bytes), not caching")
+            return
+
+        self._datasets[key] = dataset
+        self._sizes[key] = size
+        while self.current_bytes > self.max_bytes:
+            evicted_key, _ = self._datasets.popitem(last=False)
+            self._sizes.pop(evicted_key)
+            self.evictions += 1
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._datasets.clear()
+            self._sizes.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "dataset_cache_hits": self.hits,
+            "dataset_cache_misses": self.misses,
+            "dataset_cache_evictions": self.evictions,
+            "dataset_cache_bytes": self.current_bytes,
+        }
+
+    def __len__(self):
+        return len(self._datasets)
+
+    def __repr__(self):
+        return f"DatasetCache: {len(self)} datasets, {self.current_bytes}/{self.max_bytes} bytes"
+
+
+def size_of(obj) -> int:
+    """
+    Estimates the memory footprint of a dataset object, in bytes
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (tuple, list)):
+        return sum(size_of(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(size_of(item) for item in obj.values())
+    return sys.getsizeof(obj)
+
+
+def read_only_view(obj):
+    """
+    Returns a view of a dataset object which doesn't allow modifying the original object
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return obj.copy(deep=not copy_on_write_enabled())
+    if isinstance(obj, np.ndarray):
+        view = obj.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(obj, tuple):
+        return tuple(read_only_view(item) for item in obj)
+    if isinstance(obj, list):
+        return [read_only_view(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: read_only_view(item) for key, item in obj.items()}
+    return obj
+
+
+def copy_on_write_enabled() -> bool:
+    """
+    Whether pandas copies shared data when it is modified, so shallow copies can't change the original object
+    """
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+# Process-wide cache, shared by all data loaders
+dataset_cache = DatasetCache()
@@ -1,14 +1,111 @@
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from .data_loader import DataLoader
+from .sharding import select_rows
 
 
 class NLPSampleDataLoader(DataLoader):
+    data_path = "../data/raw"
+    splits = ("imdb_train", "imdb_test")
+    # Rows per chunk when streaming a split through the sampler
+    chunk_size = 10000
+
     def download_dataset(self) -> None:
         pass
 
     def get_dataset(self):
-        df_train = pd.read_csv("../data/raw/imdb_train.data")
-        df_test = pd.read_csv("../data/raw/imdb_test.data")
+        df_train, df_test = [self._read_split(split) for split in self.splits]
+
+        return df_train, df_test
+
+    def get_data_files(self) -> List[str]:
+        # The parquet file of a split is read if there is one, otherwise the csv file
+        files = []
+        for split in self.splits:
+            parquet_path = Path(self.data_path, f"{split}.parquet")
+            csv_path = Path(self.data_path, f"{split}.data")
+            path = parquet_path if parquet_path.exists() else csv_path
+            if path.exists():
+                files.append(str(path))
+        return files
+
+    def get_shard(self, shard_index: int, n_shards: int, strategy: str = "range"):
+        """
+        Loads one shard of the train and test sets.
+        Rows are sharded by their position in the split file, so parquet and csv files give the same shards.
+        Only the parquet row groups holding rows of the shard are read: with strategy="range" these are
+        the few row groups overlapping its range, with strategy="hash" usually all of them.
+        The legacy csv files are read entirely.
+        With a sampling spec, the shards are shards of the sample returned by get_dataset (see DataLoader.get_shard),
+        so together they hold exactly the sampled rows. Sampling streams the whole split files anyway.
+        """
+        if self.sampling:
+            return super().get_shard(shard_index, n_shards, strategy=strategy)
+
+        df_train, df_test = [
+            self._read_split_shard(split, shard_index, n_shards, strategy)
+            for split in self.splits
+        ]
 
         return df_train, df_test
+
+    def _read_split(self, split):
+        """
+        Reads one split of the dataset. Prefers the parquet file written by create_dataset,
+        falls back to the legacy csv file.
+        If a sampling spec is set, the split is streamed in chunks through the sampler.
+        :param split: name of split, e.g. imdb_train
+        :return: DataFrame with text and label columns
+        """
+        parquet_path = Path(self.data_path, f"{split}.parquet")
+        csv_path = Path(self.data_path, f"{split}.data")
+        if not self.sampling:
+            if parquet_path.exists():
+                return pd.read_parquet(parquet_path)
+            return pd.read_csv(csv_path)
+
+        return self.sampling.sample(self.iter_split(split))
+
+    def iter_split(self, split="imdb_train") -> Iterator[pd.DataFrame]:
+        """
+        Streams one split of the dataset in DataFrame chunks of chunk_size rows,
+        e.g. for out-of-core training with SentimentClassifier.fit_stream
+        :param split: name of split, e.g. imdb_train
+        :return: Iterator of DataFrames with text and label columns
+        """
+        parquet_path = Path(self.data_path, f"{split}.parquet")
+        if parquet_path.exists():
+            for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(Path(self.data_path, f"{split}.data"), chunksize=self.chunk_size)
+
+    def _read_split_shard(self, split, shard_index, n_shards, strategy):
+        parquet_path = Path(self.data_path, f"{split}.parquet")
+        if not parquet_path.exists():
+            df = pd.read_csv(Path(self.data_path, f"{split}.data"))
+            rows = select_rows(len(df), shard_index, n_shards, strategy)
+            return df.iloc[rows].reset_index(drop=True)
+
+        parquet_file = pq.ParquetFile(parquet_path)
+        metadata = parquet_file.metadata
+        rows = np.array(select_rows(metadata.num_rows, shard_index, n_shards, strategy), dtype=np.int64)
+
+        # Position of the first row of each row group, followed by the number of rows
+        group_starts = np.cumsum([0] + [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+        row_groups = np.unique(np.searchsorted(group_starts, rows, side="right") - 1)
+        table = parquet_file.read_row_groups(row_groups.tolist())
+
+        # Rows are sorted, and so are the positions in the file of the rows read
+        read_positions = np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [np.arange(group_starts[group], group_starts[group + 1]) for group in row_groups]
+        )
+        indices = np.searchsorted(read_positions, rows)
+        return table.take(pa.array(indices, type=pa.int64())).to_pandas().reset_index(drop=True)
@@ -0,0 +1,120 @@
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class SamplingSpec:
+    """
+    Describes how to sample the rows of a dataset while they are streamed from disk,
+    so that experiments on a sample don't need the full dataset in memory.
+    Exactly one of fraction or n_samples should be set.
+    :param fraction: Keep each row with this probability (Bernoulli sampling)
+    :param n_samples: Keep exactly this number of rows (reservoir sampling),
+    or this number of rows per stratum if stratify_by is set
+    :param stratify_by: Column to stratify by (requires n_samples)
+    :param seed: Random seed, for reproducibility
+    """
+
+    def __init__(self, fraction: float = None, n_samples: int = None, stratify_by: str = None, seed: int = 0):
+        if (fraction is None) == (n_samples is None):
+            raise ValueError("Exactly one of fraction or n_samples should be set")
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError(f"fraction should be in (0, 1], got {fraction}")
+        if n_samples is not None and n_samples < 1:
+            raise ValueError(f"n_samples should be positive, got {n_samples}")
+        if stratify_by and n_samples is None:
+            raise ValueError("Stratified sampling requires n_samples (number of rows per stratum)")
+
+        self.fraction = fraction
+        self.n_samples = n_samples
+        self.stratify_by = stratify_by
+        self.seed = seed
+
+    def sample(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Samples rows in a single pass over a stream of DataFrame chunks.
+        Only the sampled rows (and the current chunk) are kept in memory.
+        :param chunks: Iterable of DataFrames with the same columns
+        :return: DataFrame with the sampled rows
+        """
+        rng = np.random.default_rng(self.seed)
+        if self.fraction is not None:
+            sampled = [chunk[rng.random(len(chunk)) < self.fraction] for chunk in chunks]
+            return pd.concat(sampled, ignore_index=True) if sampled else pd.DataFrame()
+
+        if not self.stratify_by:
+            reservoir = Reservoir(self.n_samples, rng)
+            for chunk in chunks:
+                reservoir.update(chunk)
+            return reservoir.get_sample()
+
+        reservoirs = {}
+        for chunk in chunks:
+            for stratum, stratum_chunk in chunk.groupby(self.stratify_by, sort=True):
+                if stratum not in reservoirs:
+                    reservoirs[stratum] = Reservoir(self.n_samples, rng)
+                reservoirs[stratum].update(stratum_chunk)
+        if not reservoirs:
+            return pd.DataFrame()
+        return pd.concat(
+            [reservoirs[stratum].get_sample() for stratum in sorted(reservoirs)],
+            ignore_index=True,
+        )
+
+    def get_params(self) -> Dict:
+        return {
+            "sample_fraction": self.fraction,
+            "sample_n_samples": self.n_samples,
+            "sample_stratify_by": self.stratify_by,
+            "sample_seed": self.seed,
+        }
+
+    def __repr__(self):
+        return f"SamplingSpec: {self.get_params()}"
+
+
+class Reservoir:
+    """
+    Uniform sample of fixed size over a stream of DataFrame chunks (reservoir sampling, algorithm R),
+    vectorized per chunk.
+    :param size: Number of rows to keep
+    :param rng: numpy random Generator
+    """
+
+    def __init__(self, size: int, rng: np.random.Generator):
+        self.size = size
+        self._rng = rng
+        self._sample = None
+        self._seen = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        n_fill = min(self.size - self._filled(), len(chunk))
+        if n_fill > 0:
+            head = chunk.iloc[:n_fill].copy()
+            self._sample = head if self._sample is None else pd.concat([self._sample, head])
+            self._seen += n_fill
+            chunk = chunk.iloc[n_fill:]
+
+        if len(chunk) == 0:
+            return
+
+        # Row number t replaces slot j ~ U[0, t] if j < size. Later rows win over earlier ones.
+        positions = self._seen + np.arange(len(chunk))
+        slots = self._rng.integers(0, positions + 1)
+        accepted = np.flatnonzero(slots < self.size)
+        last_row_per_slot = dict(zip(slots[accepted], accepted))
+        if last_row_per_slot:
+            slots_to_replace = list(last_row_per_slot.keys())
+            rows = list(last_row_per_slot.values())
+            for column_index in range(chunk.shape[1]):
+                self._sample.iloc[slots_to_replace, column_index] = chunk.iloc[rows, column_index].to_numpy()
+        self._seen += len(chunk)
+
+    def get_sample(self) -> pd.DataFrame:
+        if self._sample is None:
+            return pd.DataFrame()
+        return self._sample.reset_index(drop=True)
+
+    def _filled(self) -> int:
+        return 0 if self._sample is None else len(self._sample)
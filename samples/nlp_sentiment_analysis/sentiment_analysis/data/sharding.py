@@ -0,0 +1,55 @@
+import zlib
+from typing import Iterable, List
+
+
+def validate_shard(shard_index: int, n_shards: int) -> None:
+    """
+    Verifies that shard_index is a valid shard out of n_shards
+    """
+    if n_shards < 1:
+        raise ValueError(f"n_shards should be positive, got {n_shards}")
+    if not 0 <= shard_index < n_shards:
+        raise ValueError(f"shard_index should be in [0, {n_shards}), got {shard_index}")
+
+
+def range_shard(n_items: int, shard_index: int, n_shards: int) -> range:
+    """
+    Splits n_items into n_shards contiguous, balanced ranges
+    :return: the range of item positions belonging to shard_index
+    """
+    validate_shard(shard_index, n_shards)
+    start = n_items * shard_index // n_shards
+    end = n_items * (shard_index + 1) // n_shards
+    return range(start, end)
+
+
+def stable_hash(item_id) -> int:
+    """
+    Hash of an id which is identical across processes and machines
+    (unlike the builtin hash, which is salted per process for str)
+    """
+    return zlib.crc32(str(item_id).encode("utf-8"))
+
+
+def hash_shard(ids: Iterable, shard_index: int, n_shards: int) -> List[int]:
+    """
+    Assigns each id to a shard using a stable hash of the id
+    :return: the positions of the ids belonging to shard_index
+    """
+    validate_shard(shard_index, n_shards)
+    return [i for i, item_id in enumerate(ids) if stable_hash(item_id) % n_shards == shard_index]
+
+
+def select_rows(n_rows: int, shard_index: int, n_shards: int, strategy: str = "range") -> List[int]:
+    """
+    Selects the rows of a shard, using the row positions as row ids
+    :param n_rows: Number of rows of the dataset
+    :param strategy: "range" for contiguous ranges, "hash" for a stable hash of the row position
+    :return: the sorted positions of the rows belonging to shard_index
+    """
+    if strategy == "range":
+        return list(range_shard(n_rows, shard_index, n_shards))
+    elif strategy == "hash":
+        return hash_shard(range(n_rows), shard_index, n_shards)
+    else:
+        raise ValueError(f"Unknown sharding strategy {strategy}, use 'range' or 'hash'")
@@ -1,4 +1,17 @@
+from .token_ids import TokenIds
 from .data_processor import DataProcessor
 from .empty_processor import EmptyProcessor
+from .pipeline_processor import PipelineProcessor
+from .parallel_processor import ParallelProcessor
+from .cached_processor import CachedProcessor
+from .vectorized_processor import VectorizedProcessor
 
-__all__ = ["DataProcessor", "EmptyProcessor"]
+__all__ = [
+    "DataProcessor",
+    "EmptyProcessor",
+    "PipelineProcessor",
+    "ParallelProcessor",
+    "CachedProcessor",
+    "VectorizedProcessor",
+    "TokenIds",
+]
@@ -0,0 +1,82 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sentiment_analysis.data_processing.token_ids import TokenIds
+
+
+def slice_batch(X, start: int, end: int):
+    """
+    Returns the items of a batch (list, numpy array or pandas object) in positions [start, end)
+    """
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return X.iloc[start:end]
+    return X[start:end]
+
+
+def iter_chunks(X, chunk_size: int) -> Iterator:
+    """
+    Splits a batch into consecutive chunks of up to chunk_size items
+    """
+    for start in range(0, len(X), chunk_size):
+        yield slice_batch(X, start, start + chunk_size)
+
+
+def iter_stream_chunks(X: Iterable, chunk_size: int) -> Iterator[List]:
+    """
+    Lazily groups a stream of items into lists of up to chunk_size items
+    """
+    iterator = iter(X)
+    chunk = list(islice(iterator, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, chunk_size))
+
+
+def concat_batches(outputs: List):
+    """
+    Concatenates the outputs of processing consecutive chunks into one batch
+    """
+    if not outputs:
+        return []
+    if isinstance(outputs[0], (pd.DataFrame, pd.Series)):
+        return pd.concat(outputs)
+    if isinstance(outputs[0], np.ndarray):
+        return np.concatenate(outputs)
+    if isinstance(outputs[0], TokenIds):
+        return TokenIds.concat(outputs)
+    return [item for output in outputs for item in output]
+
+
+def shuffle_stream(chunks: Iterable[Tuple], buffer_size: int, batch_size: int,
+                   rng: np.random.Generator) -> Iterator[Tuple[List, List]]:
+    """
+    Approximately shuffles a stream of (X, y) chunks, keeping at most buffer_size + batch_size
+    rows (plus the current chunk) in memory.
+    Rows are drawn at random from the buffer into batches of batch_size rows, and the last
+    rows of the stream are shuffled and emitted when it ends.
+    :param chunks: Iterable of (X, y) pairs of batches of equal lengths
+    :param buffer_size: Number of rows kept in the buffer between batches
+    :param batch_size: Number of rows per emitted batch
+    :param rng: numpy random Generator
+    :return: Iterator of (X, y) lists of up to batch_size rows
+    """
+    X_buffer, y_buffer = [], []
+    for X, y in chunks:
+        X_buffer.extend(X.tolist() if isinstance(X, (pd.Series, np.ndarray)) else X)
+        y_buffer.extend(y.tolist() if isinstance(y, (pd.Series, np.ndarray)) else y)
+        n_batches = (len(X_buffer) - buffer_size) // batch_size
+        if n_batches > 0:
+            order = rng.permutation(len(X_buffer))
+            for start in range(0, n_batches * batch_size, batch_size):
+                batch = order[start:start + batch_size]
+                yield [X_buffer[i] for i in batch], [y_buffer[i] for i in batch]
+            rest = order[n_batches * batch_size:]
+            X_buffer, y_buffer = [X_buffer[i] for i in rest], [y_buffer[i] for i in rest]
+
+    order = rng.permutation(len(X_buffer))
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        yield [X_buffer[i] for i in batch], [y_buffer[i] for i in batch]
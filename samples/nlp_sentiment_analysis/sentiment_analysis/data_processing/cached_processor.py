@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import pickle
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from sentiment_analysis.data_processing import DataProcessor, TokenIds
+from sentiment_analysis.data_processing.disk_cache import (
+    find_entry, fingerprint, load_array, state_fingerprint, store_entry
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "../data/interim/transform_cache"
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+
+class CachedProcessor(DataProcessor):
+    """
+    Wraps a data processor and caches the outputs of its apply_batch on disk,
+    so that re-running an experiment with the same processor and data skips preprocessing.
+    The cache key is made of the processor class, its params (get_output_params) and a fingerprint of the input,
+    so get_params should describe everything which affects the processor's output. Params which don't,
+    like the number of workers, are listed in the processor's execution_params and left out of the key.
+    Lists of strings are stored as one utf-8 buffer plus offsets, and numeric numpy arrays and TokenIds
+    as .npy files.
+    Both are memory-mapped back on a hit. Other outputs are pickled.
+    apply_batch returns lists of strings as MappedStrings on a miss as well, so callers get the same type
+    either way (numpy arrays are np.memmap arrays on a hit).
+    fit is cached as well: the fitted state (see DataProcessor.get_fitted_state) is stored
+    and restored when the processor is fitted again on the same data,
+    and the outputs of apply_batch are keyed by the fitted state they were computed with.
+    When the cache exceeds max_bytes, the least recently used entries are deleted.
+    Note that objects held by the processor (e.g. a loaded spaCy model) are not part of the key.
+    :param processor: DataProcessor to cache
+    :param cache_dir: Directory to store cached outputs in
+    :param max_bytes: Maximum size of the cache directory
+    :param processor_name: Name of processor (default: the wrapped processor's name)
+    """
+
+    def __init__(self, processor: DataProcessor, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES, processor_name=None):
+        self.processor = processor
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._fit_key = ""
+        super().__init__(processor_name=processor_name or processor.name)
+
+    def fit(self, X, y=None) -> "CachedProcessor":
+        fit_key = self.get_key(X, y=y, fit=True)
+        entry_path = find_entry(self.cache_dir, fit_key)
+        if entry_path is not None:
+            self.hits += 1
+            logger.info(f"Loading fitted {self.processor.name} from cache {entry_path}")
+            self.processor.load_fitted_state(entry_path / "state.pkl")
+        else:
+            self.misses += 1
+            self.processor.fit(X, y)
+            store_entry(self.cache_dir, fit_key, lambda path: self.processor.save_fitted_state(path / "state.pkl"),
+                        self.max_bytes)
+        self._fit_key = fit_key
+        return self
+
+    def get_fitted_state(self) -> Dict:
+        return self.processor.get_fitted_state()
+
+    def set_fitted_state(self, state: Dict) -> None:
+        self.processor.set_fitted_state(state)
+        self._fit_key = state_fingerprint(state)
+
+    def apply(self, X):
+        return self.processor.apply(X)
+
+    def apply_batch(self, X):
+        key = self.get_key(X)
+        entry_path = find_entry(self.cache_dir, key)
+        if entry_path is not None:
+            self.hits += 1
+            logger.info(f"Loading {self.processor.name} outputs from cache {entry_path}")
+            return _load_entry(entry_path)
+
+        self.misses += 1
+        output = _as_mapped_strings(self.processor.apply_batch(X))
+        store_entry(self.cache_dir, key, lambda path: _write_entry(path, output), self.max_bytes)
+        return output
+
+    def apply_stream(self, X: Iterable, chunk_size: int = 1000) -> Iterator:
+        return self.processor.apply_stream(X, chunk_size=chunk_size)
+
+    def get_key(self, X, y=None, fit: bool = False) -> str:
+        """
+        Returns the cache key of fitting the wrapped processor on X and y (if fit is True)
+        or of applying it on X
+        """
+        config = self.processor.get_output_params()
+        processor_class = self.processor.__class__
+        key = hashlib.blake2b(digest_size=20)
+        key.update(f"{processor_class.__module__}.{processor_class.__qualname__}".encode("utf-8"))
+        key.update(repr(sorted(config.items(), key=lambda item: str(item[0]))).encode("utf-8"))
+        key.update(fingerprint(X).encode("utf-8"))
+        if fit:
+            key.update(b"fit")
+            key.update(fingerprint([] if y is None else y).encode("utf-8"))
+        else:
+            key.update(self._fit_key.encode("utf-8"))
+        return key.hexdigest()
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_params(self) -> Dict:
+        return self.processor.get_params()
+
+    def get_output_params(self) -> Dict:
+        return self.processor.get_output_params()
+
+    def get_metrics(self) -> Dict:
+        metrics = dict(self.processor.get_metrics() or {})
+        metrics.update({"transform_cache_hits": self.hits, "transform_cache_misses": self.misses})
+        return metrics
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        counts = {"hits": self.hits, "misses": self.misses, "processor": self.processor.take_metric_counts()}
+        self.hits = 0
+        self.misses = 0
+        return counts
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        self.hits += counts["hits"]
+        self.misses += counts["misses"]
+        if counts["processor"] is not None:
+            self.processor.merge_metric_counts(counts["processor"])
+
+
+class MappedStrings(Sequence):
+    """
+    Read-only sequence of strings backed by a (memory-mapped) utf-8 buffer and offsets.
+    Strings are decoded when accessed.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MappedStrings index out of range")
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+
+def _as_mapped_strings(output):
+    """
+    Returns a list of strings as MappedStrings over an in-memory utf-8 buffer, and other outputs unchanged
+    """
+    if not isinstance(output, list) or not all(isinstance(item, str) for item in output):
+        return output
+    encoded = [item.encode("utf-8") for item in output]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.array([len(item) for item in encoded], dtype=np.int64), out=offsets[1:])
+    return MappedStrings(data=np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets=offsets)
+
+
+def _write_entry(path: Path, output) -> None:
+    if isinstance(output, MappedStrings):
+        np.save(path / "data.npy", output.data)
+        np.save(path / "offsets.npy", output.offsets)
+        output_format = "strings"
+    elif isinstance(output, TokenIds):
+        np.save(path / "offsets.npy", output.offsets - output.offsets[0])
+        np.save(path / "data.npy", output.ids[output.offsets[0]:output.offsets[-1]])
+        output_format = "token_ids"
+    elif isinstance(output, np.ndarray) and output.dtype != object:
+        np.save(path / "data.npy", output)
+        output_format = "array"
+    else:
+        with open(path / "data.pkl", "wb") as f:
+            pickle.dump(output, f)
+        output_format = "pickle"
+
+    with open(path / "meta.json", "w") as f:
+        json.dump({"format": output_format}, f)
+
+
+def _load_entry(path: Path):
+    with open(path / "meta.json") as f:
+        output_format = json.load(f)["format"]
+
+    if output_format == "strings":
+        return MappedStrings(data=load_array(path / "data.npy"), offsets=load_array(path / "offsets.npy"))
+    if output_format == "token_ids":
+        return TokenIds(offsets=load_array(path / "offsets.npy"), ids=load_array(path / "data.npy"))
+    if output_format == "array":
+        return load_array(path / "data.npy")
+    with open(path / "data.pkl", "rb") as f:
+        return pickle.load(f)
@@ -1,20 +1,76 @@
+import pickle
 from abc import abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, Iterator, Optional
 
 from sentiment_analysis import LoggableObject
+from sentiment_analysis.data_processing.batching import iter_stream_chunks
 
 
 class DataProcessor(LoggableObject):
+    # Names of get_params entries which only control how the output is computed (e.g. the number of workers),
+    # left out of the cache keys of the processor's outputs
+    execution_params = ()
+
     def __init__(self, processor_name=None):
         """
         Umbrella abstract class for all pre or post data processors.
         Inherit from the class to implement data cleaning, preprocessing or postprocessing
-        Treats data prior/after to running a model
+        Treats data prior/after to running a model.
+        Processors which learn from data (e.g. vocabularies, scalers or encoders) override fit,
+        and keep what they learned in attributes ending with an underscore (e.g. self.vocabulary_),
+        which is the fitted state saved by save_fitted_state.
         :param processor_name Name of processor
         """
 
         super().__init__(name=processor_name)
 
+    def fit(self, X, y=None) -> "DataProcessor":
+        """
+        Learns the processor's state from the training data.
+        Stateless processors don't need to override this method.
+        :param X: Training set
+        :param y: Target values
+        :return: self
+        """
+        return self
+
+    def fit_apply_batch(self, X, y=None):
+        """
+        Fits the processor and applies it on the same data
+        """
+        return self.fit(X, y).apply_batch(X)
+
+    def get_fitted_state(self) -> Dict:
+        """
+        Returns the state learned by fit: all attributes ending with an underscore
+        """
+        return {key: value for key, value in vars(self).items() if key.endswith("_") and not key.startswith("__")}
+
+    def set_fitted_state(self, state: Dict) -> None:
+        """
+        Restores a state returned by get_fitted_state, so the processor can be applied without fitting it again
+        """
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def save_fitted_state(self, file_path: str) -> None:
+        """
+        Stores the fitted state in a pickle, to be reused across experiments
+        :param file_path: Path to pickle
+        """
+        with open(file_path, "wb+") as f:
+            pickle.dump(self.get_fitted_state(), file=f)
+
+    def load_fitted_state(self, file_path: str) -> "DataProcessor":
+        """
+        Loads a fitted state stored by save_fitted_state
+        :param file_path: Path to pickle
+        :return: self
+        """
+        with open(file_path, "rb") as f:
+            self.set_fitted_state(pickle.load(f))
+        return self
+
     @abstractmethod
     def apply(self, **kwargs):
         pass
@@ -23,10 +79,44 @@ class DataProcessor(LoggableObject):
     def apply_batch(self, **kwargs):
         pass
 
+    def apply_stream(self, X: Iterable, chunk_size: int = 1000) -> Iterator:
+        """
+        Lazily applies the processor on a stream of items, yielding processed items one by one.
+        The default implementation calls apply_batch on lists of up to chunk_size items,
+        so only one chunk is held in memory. Override if apply_batch doesn't accept a list.
+        :param X: Iterable of items
+        :param chunk_size: Number of items passed to apply_batch at a time
+        :return: Iterator over the processed items
+        """
+        for chunk in iter_stream_chunks(X, chunk_size):
+            yield from self.apply_batch(chunk)
+
+    def get_output_params(self) -> Dict:
+        """
+        Returns the params which affect the processor's output (get_params without execution_params),
+        which CachedProcessor and FeatureCache use in their keys
+        """
+        params = self.get_params() or {}
+        return {key: value for key, value in params.items() if key not in self.execution_params}
+
     def get_metrics(self) -> Dict:
 
         # Data processors are not likely to return any metrics, just params
         return None
 
+    def take_metric_counts(self) -> Optional[Dict]:
+        """
+        Returns the counters behind get_metrics (e.g. cache hits) accumulated since the last call, and resets them.
+        ParallelProcessor sends them from its worker processes to merge_metric_counts of the processor
+        in the parent process. Processors without counters don't need to override this method.
+        """
+        return None
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        """
+        Adds the counters returned by take_metric_counts of a copy of this processor (e.g. in a worker process)
+        """
+        pass
+
     def __repr__(self):
         return f"Processor: {self.name}"
@@ -0,0 +1,72 @@
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sentiment_analysis.data_processing.token_ids import TokenIds
+
+
+def unique_inverse(X) -> Tuple[List, np.ndarray]:
+    """
+    Hashes the items of a batch (list, numpy array or pandas Series)
+    :return: The unique items in order of first occurrence,
+    and the index of each item of X in the unique items
+    """
+    values = X.tolist() if isinstance(X, (pd.Series, np.ndarray)) else X
+    index = {}
+    inverse = np.fromiter((index.setdefault(x, len(index)) for x in values), dtype=np.int64, count=len(values))
+    return list(index), inverse
+
+
+def scatter(outputs, inverse: np.ndarray):
+    """
+    Returns the outputs of the unique items in the order of the original batch
+    """
+    if isinstance(outputs, (pd.DataFrame, pd.Series)):
+        return outputs.iloc[inverse].reset_index(drop=True)
+    if isinstance(outputs, np.ndarray):
+        return outputs[inverse]
+    if isinstance(outputs, TokenIds):
+        return outputs.take(inverse)
+    outputs = list(outputs)
+    return [outputs[i] for i in inverse]
+
+
+class Deduplicator:
+    """
+    Calls a batch function once per unique item of a batch and scatters the outputs back
+    to the original order. Duplicate items must have equal outputs (e.g. deterministic preprocessing).
+    The dedup ratio, the fraction of items which were duplicates and not processed, is reported as a metric.
+    """
+
+    def __init__(self):
+        self.n_items = 0
+        self.n_unique = 0
+
+    def apply(self, func: Callable, X):
+        """
+        :param func: Function mapping a list of items to a batch of outputs, one per item
+        :param X: Batch of hashable items
+        """
+        unique, inverse = unique_inverse(X)
+        self.n_items += len(inverse)
+        self.n_unique += len(unique)
+        return scatter(func(unique), inverse)
+
+    def take_counts(self) -> Dict:
+        """
+        Returns the numbers of items and unique items since the last call, and resets them
+        """
+        counts = {"n_items": self.n_items, "n_unique": self.n_unique}
+        self.n_items = 0
+        self.n_unique = 0
+        return counts
+
+    def merge_counts(self, counts: Dict) -> None:
+        self.n_items += counts["n_items"]
+        self.n_unique += counts["n_unique"]
+
+    def get_metrics(self) -> Dict:
+        if not self.n_items:
+            return {}
+        return {"dedup_ratio": 1 - self.n_unique / self.n_items}
@@ -0,0 +1,116 @@
+"""
+Helpers shared by the on-disk caches (CachedProcessor and FeatureCache).
+An entry is a directory named by its key under the cache directory, written atomically
+and touched on every hit, so that its modification time orders the entries by recency.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(X) -> str:
+    """
+    Returns a hash of the contents of a batch.
+    Numeric arrays, Series, DataFrame columns and indexes are hashed by their dtype and bytes,
+    other values by their repr
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    _update_fingerprint(digest, X)
+    return digest.hexdigest()
+
+
+def state_fingerprint(state) -> str:
+    """
+    Returns a hash of a picklable object, e.g. a fitted state, from its pickled bytes
+    (its repr elides the middle of large arrays)
+    """
+    return hashlib.blake2b(pickle.dumps(state, protocol=5), digest_size=20).hexdigest()
+
+
+def _update_fingerprint(digest, X) -> None:
+    if isinstance(X, pd.DataFrame):
+        digest.update(repr(list(X.columns)).encode("utf-8"))
+        _update_fingerprint(digest, X.index)
+        for _, column in X.items():
+            _update_fingerprint(digest, column.to_numpy())
+        return
+    if isinstance(X, pd.Series):
+        _update_fingerprint(digest, X.index)
+        X = X.to_numpy()
+    elif isinstance(X, pd.Index):
+        X = X.to_numpy()
+
+    if isinstance(X, np.ndarray) and X.dtype != object:
+        digest.update(str((X.dtype, X.shape)).encode("utf-8"))
+        digest.update(np.ascontiguousarray(X).tobytes())
+        return
+
+    for value in X.items() if isinstance(X, dict) else X:
+        if isinstance(value, np.ndarray):
+            # The repr of arrays rounds and elides values
+            _update_fingerprint(digest, value)
+        else:
+            digest.update(repr(value).encode("utf-8"))
+        digest.update(b"\0")
+
+
+def find_entry(cache_dir: str, key: str) -> Optional[Path]:
+    """
+    Returns the path of the entry stored under key, marking it as recently used, or None if there is none
+    """
+    entry_path = Path(cache_dir, key)
+    if not entry_path.exists():
+        return None
+    os.utime(entry_path)
+    return entry_path
+
+
+def store_entry(cache_dir: str, key: str, write: Callable[[Path], None], max_bytes: int) -> Path:
+    """
+    Writes an entry into a temporary directory and renames it, so readers never see a partial entry.
+    Then evicts the least recently used entries if the cache exceeds max_bytes
+    :param cache_dir: Cache directory
+    :param key: Key of the entry
+    :param write: Function writing the entry's files into the directory it is given
+    :param max_bytes: Maximum size of the cache directory
+    :return: Path of the entry
+    """
+    entry_path = Path(cache_dir, key)
+    tmp_path = entry_path.with_name(entry_path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+    write(tmp_path)
+    os.replace(tmp_path, entry_path)
+    evict(cache_dir, max_bytes)
+    return entry_path
+
+
+def evict(cache_dir: str, max_bytes: int) -> None:
+    """
+    Deletes the least recently used entries until the cache directory is at most max_bytes
+    """
+    entries = [path for path in Path(cache_dir).iterdir() if path.is_dir() and path.suffix != ".tmp"]
+    sizes = {path: sum(f.stat().st_size for f in path.iterdir()) for path in entries}
+    total = sum(sizes.values())
+    for path in sorted(entries, key=lambda p: p.stat().st_mtime):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= sizes[path]
+
+
+def load_array(path: Path) -> np.ndarray:
+    """
+    Memory-maps a .npy file read-only, or reads it if it can't be memory-mapped
+    """
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Empty arrays cannot be memory-mapped
+        return np.load(path)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterable, Iterator
 
 from sentiment_analysis.data_processing import DataProcessor
 
@@ -14,5 +14,8 @@ class EmptyProcessor(DataProcessor):
     def apply_batch(self, X):
         return X
 
+    def apply_stream(self, X: Iterable, chunk_size: int = 1000) -> Iterator:
+        yield from X
+
     def get_params(self) -> Dict:
         return {"processor_name": self.name}
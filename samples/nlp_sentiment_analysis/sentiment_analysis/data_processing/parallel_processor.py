@@ -0,0 +1,109 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional
+
+from sentiment_analysis.data_processing import DataProcessor
+from sentiment_analysis.data_processing.batching import iter_chunks, iter_stream_chunks, concat_batches
+
+# The processor used by the current worker process, set once by the pool initializer
+_worker_processor = None
+
+
+def _init_worker(processor: DataProcessor):
+    global _worker_processor
+    _worker_processor = processor
+    # The copy holds the counters of the parent process, which already counted them
+    processor.take_metric_counts()
+
+
+def _apply_batch_in_worker(chunk):
+    return _worker_processor.apply_batch(chunk), _worker_processor.take_metric_counts()
+
+
+class ParallelProcessor(DataProcessor):
+    """
+    Wraps any data processor and runs its apply_batch on a process pool.
+    The input is split into chunks, each worker process gets the wrapped processor once
+    (when the pool starts) and the chunk outputs are returned in the original order.
+    The wrapped processor should be picklable.
+    Each worker returns the metric counters of its copy of the processor (see DataProcessor.take_metric_counts)
+    along with each chunk's output, and they are merged into the wrapped processor, so get_metrics
+    counts the work done in the workers.
+    :param processor: DataProcessor to run in parallel
+    :param n_workers: Number of worker processes (default: number of CPUs)
+    :param chunk_size: Number of items sent to a worker at a time
+    :param processor_name: Name of processor (default: ParallelProcessor(<wrapped processor name>))
+    """
+
+    def __init__(self, processor: DataProcessor, n_workers: int = None, chunk_size: int = 1000,
+                 processor_name=None):
+        self.processor = processor
+        self.n_workers = n_workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        super().__init__(processor_name=processor_name or f"ParallelProcessor({processor.name})")
+
+    def fit(self, X, y=None) -> "ParallelProcessor":
+        self.processor.fit(X, y)
+        return self
+
+    def get_fitted_state(self) -> Dict:
+        return self.processor.get_fitted_state()
+
+    def set_fitted_state(self, state: Dict) -> None:
+        self.processor.set_fitted_state(state)
+
+    def apply(self, X):
+        return self.processor.apply(X)
+
+    def apply_batch(self, X):
+        if self.n_workers == 1 or len(X) <= self.chunk_size:
+            return self.processor.apply_batch(X)
+
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=_init_worker, initargs=(self.processor,)
+        ) as executor:
+            outputs = [self._merge_worker_result(result)
+                       for result in executor.map(_apply_batch_in_worker, iter_chunks(X, self.chunk_size))]
+
+        return concat_batches(outputs)
+
+    def apply_stream(self, X: Iterable, chunk_size: int = None) -> Iterator:
+        """
+        Processes a stream of items on the process pool, keeping at most two chunks
+        per worker in flight, and yields the processed items in the original order
+        """
+        max_in_flight = 2 * self.n_workers
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=_init_worker, initargs=(self.processor,)
+        ) as executor:
+            futures = deque()
+            for chunk in iter_stream_chunks(X, chunk_size or self.chunk_size):
+                futures.append(executor.submit(_apply_batch_in_worker, chunk))
+                if len(futures) >= max_in_flight:
+                    yield from self._merge_worker_result(futures.popleft().result())
+            while futures:
+                yield from self._merge_worker_result(futures.popleft().result())
+
+    def _merge_worker_result(self, result):
+        output, counts = result
+        if counts is not None:
+            self.processor.merge_metric_counts(counts)
+        return output
+
+    def get_params(self) -> Dict:
+        params = dict(self.processor.get_params() or {})
+        params.update({"parallel_n_workers": self.n_workers, "parallel_chunk_size": self.chunk_size})
+        return params
+
+    def get_output_params(self) -> Dict:
+        return self.processor.get_output_params()
+
+    def get_metrics(self) -> Dict:
+        return self.processor.get_metrics()
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        return self.processor.take_metric_counts()
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        self.processor.merge_metric_counts(counts)
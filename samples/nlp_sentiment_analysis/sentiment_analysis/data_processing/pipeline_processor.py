@@ -0,0 +1,114 @@
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sentiment_analysis.data_processing import DataProcessor
+from sentiment_analysis.data_processing.batching import iter_chunks, concat_batches
+
+
+class PipelineProcessor(DataProcessor):
+    """
+    Data processor which chains multiple data processors.
+    apply_batch runs the input chunk by chunk through all steps, so only the intermediate
+    results of one chunk are alive at a time.
+    The params of all steps are logged (prefixed by the step index and name),
+    and the throughput of each step is reported as a metric.
+    :param steps: List of DataProcessor objects, applied in order
+    :param chunk_size: Number of items per chunk in apply_batch
+    :param processor_name: Name of processor
+    """
+
+    def __init__(self, steps: List[DataProcessor], chunk_size: int = 1000, processor_name=None):
+        if not steps:
+            raise ValueError("PipelineProcessor requires at least one step")
+        self.steps = list(steps)
+        self.chunk_size = chunk_size
+        self._items = [0] * len(self.steps)
+        self._seconds = [0.0] * len(self.steps)
+        super().__init__(processor_name=processor_name)
+
+    def fit(self, X, y=None) -> "PipelineProcessor":
+        """
+        Fits each step on the output of the previous steps
+        """
+        for i, step in enumerate(self.steps):
+            step.fit(X, y)
+            if i < len(self.steps) - 1:
+                X = step.apply_batch(X)
+        return self
+
+    def get_fitted_state(self) -> Dict:
+        return {i: step.get_fitted_state() for i, step in enumerate(self.steps)}
+
+    def set_fitted_state(self, state: Dict) -> None:
+        for i, step in enumerate(self.steps):
+            step.set_fitted_state(state.get(i, {}))
+
+    def apply(self, X):
+        for step in self.steps:
+            X = step.apply(X)
+        return X
+
+    def apply_batch(self, X):
+        outputs = []
+        for chunk in iter_chunks(X, self.chunk_size):
+            for i, step in enumerate(self.steps):
+                n_items = len(chunk)
+                start_time = perf_counter()
+                chunk = step.apply_batch(chunk)
+                self._seconds[i] += perf_counter() - start_time
+                self._items[i] += n_items
+            outputs.append(chunk)
+
+        return concat_batches(outputs)
+
+    def apply_stream(self, X: Iterable, chunk_size: int = None) -> Iterator:
+        """
+        Chains the streams of all steps, so items flow lazily through the whole pipeline
+        """
+        for step in self.steps:
+            X = step.apply_stream(X, chunk_size=chunk_size or self.chunk_size)
+        return X
+
+    def get_params(self) -> Dict:
+        params = {
+            "processor_name": self.name,
+            "pipeline_steps": " -> ".join(step.name for step in self.steps),
+            "pipeline_chunk_size": self.chunk_size,
+        }
+        for i, step in enumerate(self.steps):
+            step_params = step.get_params() or {}
+            params.update({f"{i}.{step.name}.{key}": value for key, value in step_params.items()})
+        return params
+
+    def get_output_params(self) -> Dict:
+        params = {"processor_name": self.name, "pipeline_steps": " -> ".join(step.name for step in self.steps)}
+        for i, step in enumerate(self.steps):
+            params.update({f"{i}.{step.name}.{key}": value for key, value in step.get_output_params().items()})
+        return params
+
+    def get_metrics(self) -> Dict:
+        metrics = {}
+        for i, step in enumerate(self.steps):
+            if self._seconds[i] > 0:
+                metrics[f"{i}.{step.name}.items_per_second"] = self._items[i] / self._seconds[i]
+            step_metrics = step.get_metrics() or {}
+            metrics.update({f"{i}.{step.name}.{key}": value for key, value in step_metrics.items()})
+        return metrics
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        counts = {"items": self._items, "seconds": self._seconds,
+                  "steps": [step.take_metric_counts() for step in self.steps]}
+        self._items = [0] * len(self.steps)
+        self._seconds = [0.0] * len(self.steps)
+        return counts
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        # Seconds are summed over the workers, so items_per_second is the throughput of one worker
+        for i, step in enumerate(self.steps):
+            self._items[i] += counts["items"][i]
+            self._seconds[i] += counts["seconds"][i]
+            if counts["steps"][i] is not None:
+                step.merge_metric_counts(counts["steps"][i])
+
+    def __repr__(self):
+        return f"Processor: {self.name} ({' -> '.join(step.name for step in self.steps)})"
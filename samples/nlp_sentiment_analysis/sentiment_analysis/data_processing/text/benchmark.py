@@ -0,0 +1,149 @@
+"""
+Measures the throughput (tokens per second) of the text processors.
+nltk: compares NltkTextProcessor with the previous per-text implementation (one pos_tag call,
+stopword list and regex compilation per text).
+spacy: compares the cleaning of tokenized docs in SpacyTextProcessor (a single mask over Doc.to_array)
+with the previous implementation (one token list per filter), on a synthetic corpus.
+Usage: python -m sentiment_analysis.data_processing.text.benchmark [--processor nltk] [--n_texts 5000] [--n_workers 4]
+"""
+import argparse
+import random
+import re
+import string
+from time import perf_counter
+from typing import Callable, List
+
+import nltk
+import spacy
+from nltk.corpus import stopwords
+
+from sentiment_analysis.data_processing.text import NltkTextProcessor, SpacyTextProcessor
+
+
+def per_text_preprocess(processor: NltkTextProcessor, text: str, pos_to_remove=None,
+                        remove_numbers=True, remove_stopwords=True) -> str:
+    """
+    The per-text algorithm NltkTextProcessor used before batching, kept as a baseline
+    """
+    tokens = processor.tokenize(text.lower().strip())
+
+    if pos_to_remove:
+        tokens = [word for word, tag in nltk.pos_tag(tokens) if tag[:2] not in pos_to_remove]
+
+    if remove_numbers:
+        tokens = [x for x in tokens if not re.match(r'''(?x)(?:^[p€$%]*\d+\.*\d*[€$%]*$)''', x)]
+
+    if remove_stopwords:
+        tokens = [x for x in tokens if x not in stopwords.words('english')]
+
+    return " ".join(x.strip() for x in tokens if x != '')
+
+
+def per_token_clean(doc, pos_to_remove=None, remove_numbers=True, remove_stopwords=True, normalize=None) -> str:
+    """
+    The token by token cleaning SpacyTextProcessor used before filtering on Doc.to_array, kept as a baseline
+    """
+    tokens = [token for token in doc if token.pos_ not in pos_to_remove] if pos_to_remove else doc
+    if remove_numbers:
+        tokens = [token for token in tokens if not (token.like_num or token.is_currency)]
+    if remove_stopwords:
+        tokens = [token for token in tokens if not token.is_stop]
+    tokens = [token for token in tokens if
+              not (token.is_punct or token.is_space or token.is_quote or token.is_bracket)]
+    tokens = [token for token in tokens if token.text.strip() != ""]
+
+    if normalize == "Lemmatize":
+        text = " ".join([token.lemma_ for token in tokens])
+    else:
+        text = " ".join([token.text for token in tokens])
+
+    text = re.sub(r'[^a-zA-Z\']', ' ', text)
+    text = re.sub(r'[^\x00-\x7F]+', '', text)
+    return text.lower()
+
+
+def synthetic_corpus(n_texts: int, n_words: int = 20000, seed: int = 0) -> List[str]:
+    """
+    Returns random reviews made of words with Zipfian frequencies, mixed with numbers, currencies,
+    punctuation, quotes, brackets and non ascii text
+    """
+    rng = random.Random(seed)
+    special = ["10", "3.5", "$", "€", "1st", "!", "...", ",", "(", ")", "\"", "“", "—", "<br />", "  ",
+               "café", "naïve", "U.S.", "won't", "can't", "it's", "ten", "well-made", "the", "I", "was"]
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(n_words)]
+    vocabulary = special + [word.capitalize() if i % 10 == 0 else word for i, word in enumerate(words)]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    return [" ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(20, 300))) for _ in range(n_texts)]
+
+
+def tokens_per_second(preprocess: Callable[[List[str]], List[str]], texts: List[str]) -> float:
+    """
+    Returns the number of input tokens (whitespace separated) processed per second
+    :param preprocess: Function mapping a list of texts to a list of clean texts
+    :param texts: Corpus to process
+    """
+    n_tokens = sum(len(text.split()) for text in texts)
+    start_time = perf_counter()
+    preprocess(texts)
+    return n_tokens / (perf_counter() - start_time)
+
+
+def load_corpus(n_texts: int) -> List[str]:
+    try:
+        from sentiment_analysis.data import NLPSampleDataLoader
+        df_train, _ = NLPSampleDataLoader(dataset_name="imdb", dataset_version="1.0").get_dataset()
+        texts = df_train["text"].tolist()
+        return (texts * (n_texts // max(len(texts), 1) + 1))[:n_texts]
+    except (FileNotFoundError, OSError):
+        sentence = "I watched this movie 3 times in 2019 and the acting wasn't great, but U.S. critics loved it!"
+        return [sentence] * n_texts
+
+
+def benchmark_nltk(args):
+    texts = load_corpus(args.n_texts)
+    pos_to_remove = args.pos_to_remove or None
+
+    baseline = NltkTextProcessor(pos_to_remove=pos_to_remove)
+    before = tokens_per_second(
+        lambda batch: [per_text_preprocess(baseline, text, pos_to_remove=pos_to_remove) for text in batch], texts)
+    print(f"Per text:           {before:12.0f} tokens/s")
+
+    serial = NltkTextProcessor(pos_to_remove=pos_to_remove)
+    after = tokens_per_second(serial.apply_batch, texts)
+    print(f"Batched:            {after:12.0f} tokens/s ({after / before:.1f}x)")
+
+    parallel = NltkTextProcessor(pos_to_remove=pos_to_remove, n_workers=args.n_workers)
+    after_parallel = tokens_per_second(parallel.apply_batch, texts)
+    print(f"Batched, {args.n_workers} workers: {after_parallel:12.0f} tokens/s ({after_parallel / before:.1f}x)")
+
+
+def benchmark_spacy_clean(args):
+    model = spacy.blank("en")
+    docs = list(model.pipe(synthetic_corpus(args.n_texts)))
+    texts = [doc.text for doc in docs]
+    processor = SpacyTextProcessor(spacy_model=model)
+
+    before = tokens_per_second(lambda batch: [per_token_clean(doc) for doc in docs], texts)
+    print(f"Token by token: {before:12.0f} tokens/s")
+
+    # spaCy's pipe passes Docs through, so only the cleaning is measured
+    after = tokens_per_second(lambda batch: processor.apply_batch(docs), texts)
+    print(f"To array:       {after:12.0f} tokens/s ({after / before:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processor", choices=["nltk", "spacy"], default="nltk")
+    parser.add_argument("--n_texts", type=int, default=5000)
+    parser.add_argument("--n_workers", type=int, default=4)
+    parser.add_argument("--pos_to_remove", nargs="*", default=["NN", "VB"])
+    args = parser.parse_args()
+
+    if args.processor == "spacy":
+        benchmark_spacy_clean(args)
+    else:
+        benchmark_nltk(args)
+
+
+if __name__ == "__main__":
+    main()
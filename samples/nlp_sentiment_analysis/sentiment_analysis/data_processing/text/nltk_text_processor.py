@@ -1,86 +1,240 @@
+import copy
 import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
 
 import nltk
 from nltk.corpus import stopwords
+from nltk.tokenize import NLTKWordTokenizer
 
+from sentiment_analysis.data_processing.batching import iter_chunks
 from sentiment_analysis.data_processing.text import TextProcessor
+from sentiment_analysis.data_processing.text.normalization_memo import DEFAULT_MAX_SIZE
+
+NUMBER_PATTERN = re.compile(r'''(?x)(?:^[p€$%]*\d+\.*\d*[€$%]*$)''')
+
+TOKEN_PATTERN = re.compile(r'''(?x)
+    (?P<apostrophe>\w+'\w+)                    # match words separated by a '
+    |(?P<hyphenated>\w+(?:-\w+)+)              # part-one; face-to-face
+    |(?P<abbreviation>(?:\w\.)+)               # U.S.A. etc
+    |(?P<dotted>\w+\.\w+(?:.\w+)+)             # 12.402.2mvdwu.10.0696cal
+    |(?P<number>[p%€$.]*\d+[,.]*\d*[%€$]*)     # $21.3 3.56% p0.001 456 4.5 etc.
+    |(?P<word>\w+)                             # match any word
+    ''', re.DOTALL)
+
+# Tokens which only contain word characters, optionally joined by single dots or hyphens
+SIMPLE_TOKEN_PATTERN = re.compile(r"\w+(?:[.\-]\w+)*")
+SEPARATOR_PATTERN = re.compile(r"[.\-]")
+
+# Words the Treebank tokenizer splits after their third character (e.g. gonna -> gon na)
+CONTRACTIONS = frozenset({"cannot", "gimme", "gonna", "gotta", "lemme", "wanna"})
+# Words the Treebank tokenizer splits before their apostrophe (d'ye -> d 'ye, more'n -> more 'n)
+APOSTROPHE_CONTRACTIONS = frozenset({"d", "more"})
+# Endings the Treebank tokenizer splits off words, e.g. it's -> it 's
+CLITICS = frozenset({"s", "S", "m", "M", "d", "D", "ll", "LL", "re", "RE", "ve", "VE"})
+
+_word_tokenizer = NLTKWordTokenizer()
+
+# The processor used by the current worker process, set once by the pool initializer
+_worker_processor = None
+
+
+def _init_worker(processor: "NltkTextProcessor"):
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _apply_batch_in_worker(texts: List[str]) -> Tuple[List[str], Dict]:
+    return _worker_processor.apply_batch(texts), _worker_processor.take_metric_counts()
 
 
 class NltkTextProcessor(TextProcessor):
+    execution_params = ("n_workers", "chunk_size")
 
     def __init__(self,
                  remove_numbers=True,
                  pos_to_remove=None,
                  remove_stopwords=True,
-                 normalize=None):
+                 normalize=None,
+                 n_workers=1,
+                 chunk_size=1000,
+                 normalization_memo_size=DEFAULT_MAX_SIZE,
+                 normalization_memo_path=None,
+                 output="text"):
+        """
+        Text processor based on nltk.
+        apply_batch tokenizes a chunk of texts, POS tags all of them at once (pos_tag_sents)
+        and filters tokens using a precomputed stopword set and precompiled patterns.
+        :param n_workers: Number of processes apply_batch runs on. The workers' lemmas or stems and memo stats
+        are merged into this processor's normalization memo, which is saved once by this process
+        :param chunk_size: Number of texts processed together (and sent to a worker at a time)
+        :param normalization_memo_size: Number of tokens whose lemma or stem is memoized
+        :param normalization_memo_path: Optional file to persist the lemmas or stems in between runs
+        """
         super().__init__(remove_numbers=remove_numbers,
                          pos_to_remove=pos_to_remove,
                          remove_stopwords=remove_stopwords,
-                         normalize=normalize)
+                         normalize=normalize,
+                         normalization_memo_size=normalization_memo_size,
+                         normalization_memo_path=normalization_memo_path,
+                         output=output)
+
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
 
         self.__wordnet_lemmatizer = nltk.WordNetLemmatizer()
         self.__porter_stemmer = nltk.PorterStemmer()
+        self.__stopwords = None
+        self.__pos_set = frozenset(pos_to_remove or ())
+
+        if normalize == "Lemmatize":
+            self.create_normalization_memo("wordnet_lemmatize", self.__wordnet_lemmatizer.lemmatize)
+        elif normalize == "Stem":
+            self.create_normalization_memo("porter_stem", self.__porter_stemmer.stem)
 
         # nltk.download('stopwords')
         # nltk.download('wordnet')
         # nltk.download('averaged_perceptron_tagger')
 
-    def preprocess_as_list(self, texts):
-        clean_texts = []
-        for text in texts:
-            clean_texts.append(self.preprocess(text))
+    def apply(self, text):
+        if self.output == "token_ids":
+            return self.__encode(self.__preprocess_chunk([text]))[0]
+        return self.preprocess(text)
+
+    def apply_batch(self, texts):
+        if self.n_workers > 1 and len(texts) > self.chunk_size:
+            return self.__apply_batch_parallel(texts)
+
+        token_lists = []
+        texts = list(texts)
+        for start in range(0, len(texts), self.chunk_size):
+            token_lists.extend(self.__preprocess_chunk(texts[start:start + self.chunk_size]))
+
+        if self.normalization_memo is not None:
+            self.normalization_memo.save()
+        if self.output == "token_ids":
+            return self.__encode(token_lists)
+        return [" ".join(tokens) for tokens in token_lists]
+
+    def __apply_batch_parallel(self, texts):
+        # Workers return clean texts, the vocabulary is only used in this process
+        serial_processor = copy.copy(self)
+        serial_processor.n_workers = 1
+        serial_processor.output = "text"
+        if self.normalization_memo is not None:
+            serial_processor.normalization_memo = self.normalization_memo.worker_copy()
 
+        clean_texts = []
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=_init_worker, initargs=(serial_processor,)
+        ) as executor:
+            for chunk_texts, counts in executor.map(_apply_batch_in_worker, iter_chunks(texts, self.chunk_size)):
+                clean_texts.extend(chunk_texts)
+                if counts is not None:
+                    self.merge_metric_counts(counts)
+
+        if self.normalization_memo is not None:
+            self.normalization_memo.save()
+        if self.output == "token_ids":
+            return self.encode(text.split() for text in clean_texts)
         return clean_texts
 
+    def __encode(self, token_lists: List[List[str]]):
+        # Stripping may leave empty tokens, which are not tokens of the space joined text
+        return self.encode([token for token in tokens if token] for tokens in token_lists)
+
+    def preprocess_as_list(self, texts):
+        return self.apply_batch(texts)
+
     def preprocess(self, text):
+        return " ".join(self.__preprocess_chunk([text])[0])
 
-        # Normalize text
-        text = text.lower().strip()
+    def __preprocess_chunk(self, texts: List[str]) -> List[List[str]]:
 
-        text = self.tokenize(text)
+        # Normalize text
+        token_lists = [self.tokenize(text.lower().strip()) for text in texts]
 
         # POS Tagging
         if self._pos_to_remove:
-            pos = nltk.pos_tag(text)
-            text = [x[0] for x in pos if x[1][:2] not in self._pos_to_remove]
+            token_lists = [
+                [word for word, tag in tagged_tokens if tag[:2] not in self.__pos_set]
+                for tagged_tokens in nltk.pos_tag_sents(token_lists)
+            ]
+
+        return [self.__clean(tokens) for tokens in token_lists]
+
+    def __clean(self, text: List[str]) -> List[str]:
 
         # Remove Numbers
         if self._remove_numbers:
-            text = [x for x in text if not re.match(r'''(?x)(?:^[p€$%]*\d+\.*\d*[€$%]*$)''', x)]
+            text = [x for x in text if not NUMBER_PATTERN.match(x)]
 
         # Remove Stopwords
         if self._remove_stopwords:
-            text = [x for x in text if x not in stopwords.words('english')]
+            stopword_set = self.__get_stopwords()
+            text = [x for x in text if x not in stopword_set]
 
-        # Normalize
-        if self._normalize == "Lemmatize":
-            text = [self.__wordnet_lemmatizer.lemmatize(x) for x in text]
-        elif self._normalize == "Stem":
-            text = [self.__porter_stemmer.stem(x) for x in text]
-        else:
-            pass
+        # Normalize (Lemmatize or Stem)
+        if self.normalization_memo is not None:
+            text = [self.normalization_memo(x) for x in text]
 
         # Clean
-        text = [x.strip() for x in text if x != '']
+        return [x.strip() for x in text if x != '']
 
-        return " ".join(text)
+    def __get_stopwords(self):
+        if self.__stopwords is None:
+            self.__stopwords = frozenset(stopwords.words('english'))
+        return self.__stopwords
 
     def tokenize(self, text):
-        # Tokenize
-        pattern = r''' (?x)
-                            (?:\w+'\w+)                            # match words separated by a '
-                            |(?:\w+(?:-\w+)+)                      # part-one; face-to-face
-                            |(?:\w\.)+                             # U.S.A. etch
-                            |(?:\w+\.\w+(?:.\w+)+)                 # 12.402.2mvdwu.10.0696cal
-                            |(?x)(?:[p%€$.]*\d+[,.]*\d*[%€$]*)     # $21.3 3.56% p0.001 456 4.5 etc.
-                            |\w+                                   # match any word
-                            |\s+                                   # spaces 
-                            '''
-        text = nltk.regexp_tokenize(text, pattern)
-
-        # Fixing things the regexp_tokenizer misses:
+        """
+        Tokenizes the text in a single scan of TOKEN_PATTERN.
+        Produces the same tokens as running nltk.word_tokenize on every token of nltk.regexp_tokenize(text, TOKEN_PATTERN),
+        but only the rare tokens which the Treebank tokenizer would change are passed to it.
+        """
         word_tokens = []
-        for word in text:
-            word_tokens.extend(nltk.word_tokenize(word))
+        for match in TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            if match.lastgroup == "word" and token.lower() not in CONTRACTIONS:
+                word_tokens.append(token)
+            else:
+                word_tokens.extend(_split_token(match.lastgroup, token))
 
         return word_tokens
+
+    def get_params(self) -> Dict:
+        params = super().get_params()
+        params.update({"n_workers": self.n_workers, "chunk_size": self.chunk_size})
+        return params
+
+
+def _split_token(kind: str, token: str) -> List[str]:
+    """
+    Returns the Treebank tokens of one match of TOKEN_PATTERN
+    :param kind: Name of the TOKEN_PATTERN group which matched
+    :param token: Matched text
+    """
+    if kind == "word":
+        if token.lower() in CONTRACTIONS:
+            return [token[:3], token[3:]]
+        return [token]
+
+    if kind == "apostrophe":
+        stem, ending = token.split("'")
+        if stem.lower() not in APOSTROPHE_CONTRACTIONS and \
+                not {stem.lower(), stem[:-1].lower(), ending.lower()} & CONTRACTIONS:
+            if ending in CLITICS:
+                return [stem, "'" + ending]
+            if (stem[-1], ending) in (("n", "t"), ("N", "T")):
+                return [stem[:-1], stem[-1] + "'" + ending] if len(stem) > 1 else [token]
+            return [token]
+
+    elif kind == "abbreviation":
+        # The final period is split off
+        return [token[:-1], "."]
+
+    elif SIMPLE_TOKEN_PATTERN.fullmatch(token):
+        if not any(part.lower() in CONTRACTIONS for part in SEPARATOR_PATTERN.split(token)):
+            return [token]
+
+    return _word_tokenizer.tokenize(token)
@@ -0,0 +1,128 @@
+import copy
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 200000
+
+
+class NormalizationMemo:
+    """
+    Bounded LRU memo of a token normalization function (e.g. lemmatization or stemming).
+    Vocabularies are Zipfian, so most tokens are normalized from the memo.
+    If a path is given, the memo is loaded from it when created and save writes it back,
+    so the memo is kept between runs.
+    Worker processes use a worker_copy, which doesn't save: it records the tokens it normalizes,
+    and the parent process merges them (see take_delta and merge) and saves once.
+    :param name: Name of the normalization (e.g. wordnet_lemmatize), stored with the persisted entries
+    :param normalize: Function mapping a token to its normalized form
+    :param max_size: Maximum number of tokens kept. The least recently used tokens are evicted when it is exceeded
+    :param path: Optional file to persist the memo in
+    """
+
+    def __init__(self, name: str, normalize: Callable[[str], str], max_size: int = DEFAULT_MAX_SIZE,
+                 path: str = None):
+        self.name = name
+        self.normalize = normalize
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        # Tokens normalized since the last take_delta, in worker copies only
+        self._new_entries = None
+        if path and Path(path).exists():
+            self.load()
+
+    def __call__(self, token: str) -> str:
+        entries = self._entries
+        normalized = entries.get(token)
+        if normalized is not None:
+            self.hits += 1
+            entries.move_to_end(token)
+            return normalized
+
+        self.misses += 1
+        normalized = self.normalize(token)
+        entries[token] = normalized
+        self._dirty = True
+        if self._new_entries is not None:
+            self._new_entries[token] = normalized
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return normalized
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self) -> None:
+        with open(self.path, "rb") as f:
+            stored = pickle.load(f)
+        if stored["name"] != self.name:
+            logger.warning(f"{self.path} holds a memo of {stored['name']}, not {self.name}. Ignoring it")
+            return
+        self._entries = OrderedDict(list(stored["entries"].items())[-self.max_size:])
+        self._dirty = False
+
+    def save(self) -> None:
+        """
+        Writes the memo to path, if there is one and new tokens were normalized since the last save
+        """
+        if not self.path or not self._dirty:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"name": self.name, "entries": dict(self._entries)}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def worker_copy(self) -> "NormalizationMemo":
+        """
+        Returns a copy of the memo for a worker process, which starts from the current entries,
+        never saves and records the tokens it normalizes
+        """
+        memo = copy.copy(self)
+        memo.path = None
+        memo.hits = 0
+        memo.misses = 0
+        memo._entries = OrderedDict(self._entries)
+        memo._new_entries = {}
+        return memo
+
+    def take_delta(self) -> Dict:
+        """
+        Returns the tokens normalized and the hits and misses counted since the last call, and resets them
+        """
+        delta = {"entries": self._new_entries or {}, "hits": self.hits, "misses": self.misses}
+        self._new_entries = {} if self._new_entries is not None else None
+        self.hits = 0
+        self.misses = 0
+        return delta
+
+    def merge(self, delta: Dict) -> None:
+        """
+        Adds the entries and stats returned by take_delta of a worker copy
+        """
+        self.hits += delta["hits"]
+        self.misses += delta["misses"]
+        if not delta["entries"]:
+            return
+        self._entries.update(delta["entries"])
+        self._dirty = True
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        calls = self.hits + self.misses
+        return {
+            "normalization_memo_hits": self.hits,
+            "normalization_memo_misses": self.misses,
+            "normalization_memo_hit_rate": self.hits / calls if calls else 0.0,
+        }
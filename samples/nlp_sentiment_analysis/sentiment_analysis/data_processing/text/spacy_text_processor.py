@@ -1,14 +1,28 @@
 import re
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional
 
+import numpy as np
 import spacy
+from spacy.attrs import ORTH, LEMMA, POS
 from spacy.language import Language
+from spacy.parts_of_speech import IDS
 from tqdm import tqdm
 
+from sentiment_analysis.data_processing.dedup import Deduplicator
 from sentiment_analysis.data_processing.text import TextProcessor
 
+# Pipes needed for part of speech tags (the tokenizer and lexical attributes like is_stop always run)
+POS_PIPES = ("tok2vec", "transformer", "tagger", "morphologizer", "attribute_ruler")
+# Pipes needed for lemmas
+LEMMA_PIPES = POS_PIPES + ("lemmatizer", "trainable_lemmatizer")
+# Pipes of en_core_web_sm 3.x (see the model pinned in requirements.txt)
+DEFAULT_MODEL_PIPES = ("tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner")
+
+NON_LETTER_PATTERN = re.compile(r"[^a-zA-Z']")
+
 
 class SpacyTextProcessor(TextProcessor):
+    execution_params = ("n_process", "batch_size", "dedup")
 
     @staticmethod
     def download_spacy_model(model="en_core_web_sm"):
@@ -19,7 +33,7 @@ class SpacyTextProcessor(TextProcessor):
         return spacy.load(model, disable=["ner", "parser"])
 
     def tokenize(self, text):
-        doc = self.model(text)
+        doc = self.model(text, disable=self.disabled_pipes)
         return [token.text for token in doc]
 
     def __init__(self,
@@ -27,65 +41,197 @@ class SpacyTextProcessor(TextProcessor):
                  remove_numbers=True,
                  pos_to_remove=None,
                  remove_stopwords=True,
-                 normalize=None):
+                 normalize=None,
+                 n_process=1,
+                 batch_size=1000,
+                 dedup=False,
+                 output="text"):
+        """
+        Text processor based on spaCy.
+        Only the pipes the options need are run: the tagger only if pos_to_remove is set
+        and the lemmatizer only if normalize="Lemmatize". The parser and NER never run.
+        :param spacy_model: Loaded spaCy model (default: en_core_web_sm, loaded without the unneeded pipes)
+        :param n_process: Number of processes spaCy runs the pipes on in apply_batch (-1 for all CPUs)
+        :param batch_size: Number of texts spaCy processes together
+        :param dedup: If True, apply_batch processes each unique text once
+        :param output: Options=("text","token_ids"), see TextProcessor
+        """
         super().__init__(remove_numbers=remove_numbers,
                          pos_to_remove=pos_to_remove,
                          remove_stopwords=remove_stopwords,
-                         normalize=normalize)
+                         normalize=normalize,
+                         output=output)
+
+        self.n_process = n_process
+        self.batch_size = batch_size
+        self.deduplicator = Deduplicator() if dedup else None
 
+        required_pipes = self.get_required_pipes()
         if not spacy_model:
-            self.model = spacy.load("en_core_web_sm")
+            self.model = spacy.load("en_core_web_sm",
+                                    exclude=[pipe for pipe in DEFAULT_MODEL_PIPES if pipe not in required_pipes])
         else:
             self.model = spacy_model
+        self.disabled_pipes = [pipe for pipe in self.model.pipe_names if pipe not in required_pipes]
+        self.__compile_filter()
+
+    def get_required_pipes(self) -> List[str]:
+        """
+        Returns the names of the spaCy pipes needed by the options of this processor
+        """
+        if self._normalize == "Lemmatize":
+            return list(LEMMA_PIPES)
+        if self._pos_to_remove:
+            return list(POS_PIPES)
+        return []
 
     def apply(self, text):
-        doc = self.model(text)
+        doc = self.model(text, disable=self.disabled_pipes)
+        if self.output == "token_ids":
+            return self.encode([self.__clean_tokens(doc)])[0]
         return self.__clean(doc)
 
     def apply_batch(self, texts=List[str]):
-        clean_texts = []
-        for doc in tqdm(self.model.pipe(texts)):
-            clean_texts.append(self.__clean(doc))
-
-        return clean_texts
-
-    def __clean(self, doc):
-
-        tokens = []
-        # POS Tagging
-        if self._pos_to_remove:
-            for token in doc:
-                if token.pos_ not in self._pos_to_remove:
-                    tokens.append(token)
-        else:
-            tokens = doc
-
-        # Remove Numbers
-        if self._remove_numbers:
-            tokens = [token for token in tokens if not (token.like_num or token.is_currency)]
-
-        # Remove Stopwords
-        if self._remove_stopwords:
-            tokens = [token for token in tokens if not token.is_stop]
-        # remove unwanted tokens
-        tokens = [token for token in tokens if
-                  not (token.is_punct or token.is_space or token.is_quote or token.is_bracket)]
-
-        # Remove empty tokens
-        tokens = [token for token in tokens if token.text.strip() != ""]
-
-        # Normalize
-        if self._normalize == "Lemmatize":
-            text = " ".join([token.lemma_ for token in tokens])
-        elif self._normalize == "Stem":
+        if self.deduplicator:
+            return self.deduplicator.apply(self.__apply_batch, texts)
+        return self.__apply_batch(texts)
+
+    def __apply_batch(self, texts):
+        if self.output == "token_ids":
+            return self.encode(tqdm(self.__clean_tokens(doc) for doc in self.__pipe(texts)))
+        return list(tqdm(self.apply_stream(texts)))
+
+    def apply_stream(self, texts: Iterable[str], chunk_size: int = None) -> Iterator:
+        """
+        Lazily cleans a stream of texts. spaCy's pipe consumes the stream in batches of chunk_size texts
+        :param texts: Iterable of texts
+        :param chunk_size: spaCy's batch size (default: batch_size)
+        :return: Iterator over the clean texts (or token id arrays in token_ids mode)
+        """
+        for doc in self.__pipe(texts, chunk_size):
+            if self.output == "token_ids":
+                yield self.encode([self.__clean_tokens(doc)])[0]
+            else:
+                yield self.__clean(doc)
+
+    def __pipe(self, texts: Iterable[str], chunk_size: int = None):
+        return self.model.pipe(texts, batch_size=chunk_size or self.batch_size,
+                               n_process=self.n_process, disable=self.disabled_pipes)
+
+    def __compile_filter(self):
+        """
+        Prepares the lookups __clean filters tokens with. Whether a token is removed because it is a number,
+        currency, stopword, punctuation, space, quote or bracket only depends on its lexeme,
+        so it is computed once per lexeme. So is the clean form of each output string (text or lemma).
+        Lexemes are kept in a sorted array (looked up with searchsorted) and a dict of recently seen
+        lexemes, which is merged into the array as it grows.
+        """
+        self.__pos_ids = np.array([IDS[pos] for pos in self._pos_to_remove or [] if pos in IDS], dtype=np.uint64)
+        # Start with the empty string (orth 0), so the lookup array is never empty
+        self.__known_orths = np.zeros(1, dtype=np.uint64)
+        self.__known_kept = np.zeros(1, dtype=bool)
+        self.__new_lexemes = {}
+        self.__clean_words = {}
+        self.__word_tokens = {}
+
+    def __is_kept(self, vocab, orth) -> bool:
+        lexeme = vocab[orth]
+        is_kept = not (
+            (self._remove_numbers and (lexeme.like_num or lexeme.is_currency))
+            or (self._remove_stopwords and lexeme.is_stop)
+            or lexeme.is_punct or lexeme.is_space or lexeme.is_quote or lexeme.is_bracket
+            or lexeme.text.strip() == ""
+        )
+        self.__new_lexemes[orth] = is_kept
+        return is_kept
+
+    def __kept_mask(self, vocab, orths: np.ndarray) -> np.ndarray:
+        known_orths = self.__known_orths
+        index = np.minimum(np.searchsorted(known_orths, orths), len(known_orths) - 1)
+        kept = self.__known_kept[index]
+        missing = np.flatnonzero(known_orths[index] != orths)
+        if len(missing):
+            new_lexemes = self.__new_lexemes
+            kept[missing] = [new_lexemes[orth] if orth in new_lexemes else self.__is_kept(vocab, orth)
+                             for orth in orths[missing].tolist()]
+            if len(new_lexemes) > len(known_orths) // 8:
+                self.__merge_new_lexemes()
+        return kept
+
+    def __merge_new_lexemes(self):
+        orths = np.concatenate([self.__known_orths, np.fromiter(self.__new_lexemes, dtype=np.uint64)])
+        kept = np.concatenate([self.__known_kept, np.fromiter(self.__new_lexemes.values(), dtype=bool)])
+        order = np.argsort(orths)
+        self.__known_orths = orths[order]
+        self.__known_kept = kept[order]
+        self.__new_lexemes = {}
+
+    def __clean_word(self, strings, key) -> str:
+        # Keep only ascii letters and apostrophes
+        word = NON_LETTER_PATTERN.sub(' ', strings[key]).lower()
+        self.__clean_words[key] = word
+        return word
+
+    def __kept_keys(self, doc) -> List[int]:
+        """
+        Returns the keys of the output strings (texts or lemmas) of the tokens to keep
+        """
+        if self._normalize == "Stem":
             raise ValueError("spaCy does not have a stemmer")
-        else:
-            text = " ".join([token.text for token in tokens])
-
-        text = re.sub(r'[^a-zA-Z\']', ' ', text)
-        # remove Unicode characters
-        text = re.sub(r'[^\x00-\x7F]+', '', text)
-
-        text = text.lower()
 
-        return text
+        # Keep tokens whose lexeme is kept and whose POS is not removed, in one mask over the doc's arrays
+        orths = doc.to_array(ORTH)
+        keep = self.__kept_mask(doc.vocab, orths)
+        if self._pos_to_remove:
+            keep &= ~np.isin(doc.to_array(POS), self.__pos_ids)
+
+        keys = doc.to_array(LEMMA) if self._normalize == "Lemmatize" else orths
+        return keys[keep].tolist()
+
+    def __clean(self, doc) -> str:
+        # Cleaning each word and joining them with spaces equals cleaning the joined text,
+        # as non letters (including the separating spaces) are replaced by spaces character by character
+        clean_words = self.__clean_words
+        strings = doc.vocab.strings
+        return " ".join([clean_words[key] if key in clean_words else self.__clean_word(strings, key)
+                         for key in self.__kept_keys(doc)])
+
+    def __clean_tokens(self, doc) -> List[str]:
+        """
+        Returns the space separated tokens of the clean text, without joining it
+        """
+        word_tokens = self.__word_tokens
+        strings = doc.vocab.strings
+        tokens = []
+        for key in self.__kept_keys(doc):
+            if key not in word_tokens:
+                word_tokens[key] = self.__clean_word(strings, key).split()
+            tokens.extend(word_tokens[key])
+        return tokens
+
+    def get_params(self) -> Dict:
+        params = super().get_params()
+        params.update({
+            "n_process": self.n_process,
+            "batch_size": self.batch_size,
+            "dedup": self.deduplicator is not None,
+            "spacy_pipes": ",".join(pipe for pipe in self.model.pipe_names if pipe not in self.disabled_pipes),
+        })
+        return params
+
+    def get_metrics(self) -> Dict:
+        metrics = dict(super().get_metrics() or {})
+        if self.deduplicator:
+            metrics.update(self.deduplicator.get_metrics())
+        return metrics
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        counts = dict(super().take_metric_counts() or {})
+        if self.deduplicator:
+            counts["dedup"] = self.deduplicator.take_counts()
+        return counts or None
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        super().merge_metric_counts(counts)
+        if counts.get("dedup") is not None and self.deduplicator:
+            self.deduplicator.merge_counts(counts["dedup"])
@@ -1,7 +1,8 @@
 from abc import abstractmethod
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional
 
-from sentiment_analysis.data_processing import DataProcessor
+from sentiment_analysis.data_processing import DataProcessor, TokenIds
+from sentiment_analysis.data_processing.text.normalization_memo import NormalizationMemo, DEFAULT_MAX_SIZE
 
 
 class TextProcessor(DataProcessor):
@@ -11,14 +12,24 @@ class TextProcessor(DataProcessor):
                  remove_numbers=False,
                  pos_to_remove=None,
                  remove_stopwords=False,
-                 normalize=None):
+                 normalize=None,
+                 normalization_memo_size=DEFAULT_MAX_SIZE,
+                 normalization_memo_path=None,
+                 output="text"):
         """
         Preprocessing abstract class. Treats textual data prior to running a model
         :param name: name of preprocessor (default=class name)
         :param remove_numbers: if to remove numbers from text
         :param remove_stopwords: if to remove stopwords from text
         :param pos_to_remove: list of PoS tags to remove
-        :param normalize:  Options=("Stem","Lemmatize"). If to apply stemming or lemmatization"""
+        :param normalize:  Options=("Stem","Lemmatize"). If to apply stemming or lemmatization
+        :param normalization_memo_size: Number of tokens whose normalized form is memoized
+        :param normalization_memo_path: Optional file to persist the normalization memo in between runs
+        :param output: Options=("text","token_ids"). If apply_batch returns clean texts, or the ids of their
+        (space separated) tokens as TokenIds, over the vocabulary built by fit. Tokens unknown to the vocabulary
+        are dropped"""
+        if output not in ("text", "token_ids"):
+            raise ValueError(f"Unknown output {output}, expected 'text' or 'token_ids'")
 
         super().__init__()
         if name:
@@ -30,6 +41,64 @@ class TextProcessor(DataProcessor):
         self._pos_to_remove = pos_to_remove
         self._remove_stopwords = remove_stopwords
         self._normalize = normalize
+        self._normalization_memo_size = normalization_memo_size
+        self._normalization_memo_path = normalization_memo_path
+        self.normalization_memo = None
+        self.output = output
+        self.vocabulary_ = None
+        self._extend_vocabulary = False
+
+    def fit(self, X, y=None) -> "TextProcessor":
+        """
+        In token_ids mode, builds the vocabulary of the clean texts of X
+        """
+        if self.output == "token_ids":
+            self.fit_apply_batch(X, y)
+        return self
+
+    def fit_apply_batch(self, X, y=None):
+        """
+        In token_ids mode, builds the vocabulary while encoding X, in a single pass
+        """
+        if self.output != "token_ids":
+            return super().fit_apply_batch(X, y)
+
+        self.vocabulary_ = {}
+        self._extend_vocabulary = True
+        try:
+            return self.apply_batch(X)
+        finally:
+            self._extend_vocabulary = False
+
+    def encode(self, token_lists: Iterable[List[str]]) -> TokenIds:
+        """
+        Maps the tokens of each document to their ids in the vocabulary
+        :param token_lists: Tokens of each document
+        """
+        vocabulary = self.vocabulary_
+        if vocabulary is None:
+            raise ValueError(f"{self.name} must be fitted before it outputs token ids")
+        if self._extend_vocabulary:
+            return TokenIds.from_lists(
+                [vocabulary.setdefault(token, len(vocabulary)) for token in tokens] for tokens in token_lists)
+        return TokenIds.from_lists(
+            [token_id for token_id in map(vocabulary.get, tokens) if token_id is not None] for tokens in token_lists)
+
+    def get_tokens(self) -> List[str]:
+        """
+        Returns the token of each id of the vocabulary
+        """
+        return sorted(self.vocabulary_, key=self.vocabulary_.get)
+
+    def create_normalization_memo(self, name: str, normalize: Callable[[str], str]) -> NormalizationMemo:
+        """
+        Creates the memo through which the processor normalizes tokens
+        :param name: Name of the normalization, e.g. wordnet_lemmatize
+        :param normalize: Function mapping a token to its normalized form
+        """
+        self.normalization_memo = NormalizationMemo(name, normalize, max_size=self._normalization_memo_size,
+                                                    path=self._normalization_memo_path)
+        return self.normalization_memo
 
     def apply(self, text):
         """
@@ -56,6 +125,30 @@ class TextProcessor(DataProcessor):
         """
         pass
 
+    def get_params(self) -> Dict:
+        return {
+            "processor_name": self.name,
+            "remove_numbers": self._remove_numbers,
+            "pos_to_remove": self._pos_to_remove,
+            "remove_stopwords": self._remove_stopwords,
+            "normalize": self._normalize,
+            "output": self.output,
+        }
+
+    def get_metrics(self) -> Dict:
+        if self.normalization_memo is None:
+            return super().get_metrics()
+        return self.normalization_memo.get_stats()
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        if self.normalization_memo is None:
+            return None
+        return {"normalization_memo": self.normalization_memo.take_delta()}
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        if counts.get("normalization_memo") is not None and self.normalization_memo is not None:
+            self.normalization_memo.merge(counts["normalization_memo"])
+
     def __str__(self):
         return f"[name:{self.name}, remove_numbers:{self._remove_numbers}, pos_to_remove:{self._pos_to_remove}," \
                f"remove stopwords:{self._remove_stopwords}, normalize: {self._normalize}]"
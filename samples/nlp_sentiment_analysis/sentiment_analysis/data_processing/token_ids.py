@@ -0,0 +1,84 @@
+from collections.abc import Sequence
+from typing import Iterable, List
+
+import numpy as np
+from scipy import sparse
+
+
+class TokenIds(Sequence):
+    """
+    Batch of tokenized documents as integer token ids, stored CSR-like:
+    the ids of document i are ids[offsets[i]:offsets[i + 1]].
+    Text processors emit it in output="token_ids" mode, with ids over the vocabulary they built in fit.
+    :param offsets: int64 array of len(documents) + 1 offsets into ids
+    :param ids: int64 array of the token ids of all documents
+    """
+
+    def __init__(self, offsets: np.ndarray, ids: np.ndarray):
+        self.offsets = offsets
+        self.ids = ids
+
+    @classmethod
+    def from_lists(cls, id_lists: Iterable[List[int]]) -> "TokenIds":
+        id_lists = list(id_lists)
+        offsets = np.zeros(len(id_lists) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, id_lists), dtype=np.int64, count=len(id_lists)), out=offsets[1:])
+        ids = np.fromiter((token_id for id_list in id_lists for token_id in id_list), dtype=np.int64,
+                          count=offsets[-1])
+        return cls(offsets, ids)
+
+    @classmethod
+    def concat(cls, batches: List["TokenIds"]) -> "TokenIds":
+        offsets = [np.zeros(1, dtype=np.int64)]
+        for batch in batches:
+            offsets.append(batch.offsets[1:] - batch.offsets[0] + offsets[-1][-1])
+        ids = [batch.ids[batch.offsets[0]:batch.offsets[-1]] for batch in batches]
+        return cls(np.concatenate(offsets), np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.take(np.arange(start, stop, step))
+            return TokenIds(self.offsets[start:max(stop, start) + 1], self.ids)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TokenIds index out of range")
+        return self.ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def take(self, indices: np.ndarray) -> "TokenIds":
+        """
+        Returns the documents in positions indices, in that order
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        starts, ends = self.offsets[indices], self.offsets[indices + 1]
+        lengths = ends - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position of each output id in self.ids
+        positions = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts, lengths)
+        return TokenIds(offsets, self.ids[positions])
+
+    def to_csr(self, n_features: int) -> sparse.csr_matrix:
+        """
+        Returns the token counts of each document as a sparse matrix of shape (len(self), n_features).
+        Ids >= n_features (tokens unknown to a vectorizer fitted on a smaller vocabulary) are ignored
+        """
+        ids = self.ids[self.offsets[0]:self.offsets[-1]]
+        rows = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        known = ids < n_features
+        counts = sparse.csr_matrix((np.ones(known.sum(), dtype=np.int64), (rows[known], ids[known])),
+                                   shape=(len(self), n_features))
+        counts.sum_duplicates()
+        return counts
+
+    def decode(self, tokens: List[str]) -> List[str]:
+        """
+        Returns the documents as space joined tokens
+        :param tokens: Token of each id
+        """
+        return [" ".join(tokens[token_id] for token_id in document.tolist()) for document in self]
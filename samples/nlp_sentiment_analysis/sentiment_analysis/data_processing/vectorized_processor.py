@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from sentiment_analysis.data_processing import DataProcessor, ParallelProcessor
+from sentiment_analysis.data_processing.batching import slice_batch
+
+logger = logging.getLogger(__name__)
+
+# Number of rows on which the vectorized output is compared with the row by row output
+PROBE_SIZE = 8
+
+
+class RowLoopProcessor(DataProcessor):
+    """
+    Implements apply_batch of a processor as a loop over its apply
+    """
+
+    def __init__(self, processor: DataProcessor):
+        self.processor = processor
+        super().__init__(processor_name=processor.name)
+
+    def apply(self, x):
+        return self.processor.apply(x)
+
+    def apply_batch(self, X):
+        if isinstance(X, pd.DataFrame):
+            return [self.processor.apply(row) for _, row in X.iterrows()]
+        return [self.processor.apply(x) for x in X]
+
+    def get_params(self) -> Dict:
+        return self.processor.get_params()
+
+    def get_output_params(self) -> Dict:
+        return self.processor.get_output_params()
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        return self.processor.take_metric_counts()
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        self.processor.merge_metric_counts(counts)
+
+
+class VectorizedProcessor(DataProcessor):
+    """
+    Lifts a processor which implements apply for one row into batch execution.
+    If apply is expressible with numpy or pandas operations (e.g. lambda row: row["a"] * 2 + row["b"]),
+    it is called once on the whole batch, operating on entire columns.
+    This is checked on every batch, by comparing the vectorized output with apply on its first few rows.
+    Otherwise, apply is called row by row, in chunks running on a process pool (see ParallelProcessor).
+    Once a batch falls back to the row loop (its vectorized call raised or its probe rows differ),
+    the following batches are processed row by row as well, without trying to vectorize them.
+    The output has the container type of the input on both paths: a list for a list,
+    a numpy array for an array and a Series (with the input's index) for a DataFrame or Series.
+    :param processor: DataProcessor implementing apply for one row
+    :param n_workers: Number of worker processes for the row by row fallback
+    :param chunk_size: Number of rows per chunk for the row by row fallback
+    :param processor_name: Name of processor (default: the wrapped processor's name)
+    """
+
+    def __init__(self, processor: DataProcessor, n_workers: int = None, chunk_size: int = 1000,
+                 processor_name=None):
+        self.processor = processor
+        self.row_loop = ParallelProcessor(RowLoopProcessor(processor), n_workers=n_workers, chunk_size=chunk_size)
+        self._vectorizable = None
+        super().__init__(processor_name=processor_name or processor.name)
+
+    def fit(self, X, y=None) -> "VectorizedProcessor":
+        self.processor.fit(X, y)
+        return self
+
+    def get_fitted_state(self) -> Dict:
+        return self.processor.get_fitted_state()
+
+    def set_fitted_state(self, state: Dict) -> None:
+        self.processor.set_fitted_state(state)
+
+    def apply(self, x):
+        return self.processor.apply(x)
+
+    def apply_batch(self, X):
+        output = None
+        if len(X) > 0 and self._vectorizable is not False:
+            output = self._try_vectorized(X)
+        if output is None:
+            output = self.row_loop.apply_batch(X)
+        return _as_container_of(X, output)
+
+    def _try_vectorized(self, X):
+        columns = np.asarray(X) if isinstance(X, list) else X
+        try:
+            output = self.processor.apply(columns)
+            if np.ndim(output) == 0 or len(output) != len(X):
+                raise ValueError("Output length does not match input length")
+            probe = slice_batch(X, 0, PROBE_SIZE)
+            expected = RowLoopProcessor(self.processor).apply_batch(probe)
+            if not _matches(expected, slice_batch(output, 0, PROBE_SIZE)):
+                raise ValueError("Vectorized output differs from row by row output")
+        except Exception as e:
+            logger.info(f"{self.processor.name}.apply is not vectorizable ({e}), falling back to a row loop")
+            self._vectorizable = False
+            return None
+
+        self._vectorizable = True
+        return output
+
+    def get_params(self) -> Dict:
+        params = dict(self.processor.get_params() or {})
+        params.update({"parallel_n_workers": self.row_loop.n_workers, "parallel_chunk_size": self.row_loop.chunk_size})
+        return params
+
+    def get_output_params(self) -> Dict:
+        return self.processor.get_output_params()
+
+    def get_metrics(self) -> Dict:
+        metrics = dict(self.processor.get_metrics() or {})
+        if self._vectorizable is not None:
+            metrics["vectorized"] = int(self._vectorizable)
+        return metrics
+
+    def take_metric_counts(self) -> Optional[Dict]:
+        return self.processor.take_metric_counts()
+
+    def merge_metric_counts(self, counts: Dict) -> None:
+        self.processor.merge_metric_counts(counts)
+
+
+def _as_container_of(X, output):
+    """
+    Returns the output as a container of the same type as the input batch
+    """
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        if isinstance(output, pd.Series):
+            return output.set_axis(X.index)
+        return pd.Series(output, index=X.index)
+    if isinstance(X, np.ndarray):
+        return np.asarray(output)
+    if isinstance(output, (np.ndarray, pd.Series)):
+        return output.tolist()
+    return list(output)
+
+
+def _matches(expected, actual) -> bool:
+    expected = list(expected)
+    actual = list(np.asarray(actual)) if not isinstance(actual, pd.Series) else actual.tolist()
+    try:
+        return np.allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), equal_nan=True)
+    except (TypeError, ValueError):
+        return actual == expected
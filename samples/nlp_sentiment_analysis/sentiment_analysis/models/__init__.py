@@ -1,4 +1,5 @@
 from .base_model import BaseModel
 from .sentiment_classifier import SentimentClassifier
+from .model_registry import ModelRegistry, model_registry
 
-__all__ = ["BaseModel", "SentimentClassifier"]
+__all__ = ["BaseModel", "SentimentClassifier", "ModelRegistry", "model_registry"]
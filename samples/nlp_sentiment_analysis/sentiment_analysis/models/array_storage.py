@@ -0,0 +1,92 @@
+"""
+Stores objects as a pickle plus one raw file per large array, using pickle protocol 5 out-of-band buffers:
+numpy arrays (including those inside scipy and scikit-learn objects) are written to separate files
+instead of being copied into the pickle, and are memory-mapped back on load.
+Processes loading the same files share their pages, and loading doesn't read the arrays until they are used.
+"""
+import bz2
+import json
+import lzma
+import mmap
+import os
+import pickle
+import shutil
+import zlib
+from pathlib import Path
+
+COMPRESSIONS = {"zlib": zlib, "bz2": bz2, "lzma": lzma}
+MMAP_MODES = {"r": mmap.ACCESS_READ, "c": mmap.ACCESS_COPY}
+# Smaller arrays are kept inside the pickle, to avoid many tiny files
+DEFAULT_MIN_ARRAY_BYTES = 64 * 1024
+
+
+def dump(obj, path: str, compression: str = None, min_array_bytes: int = DEFAULT_MIN_ARRAY_BYTES) -> None:
+    """
+    Stores obj in the directory path: object.pkl, one arrays/<i>.bin file per array of at least
+    min_array_bytes bytes, and meta.json. The directory is written atomically.
+    :param obj: Picklable object
+    :param path: Directory to store obj in, replaced if it exists
+    :param compression: None, or one of zlib, bz2 and lzma to compress the array files for cold storage.
+    Compressed arrays can't be memory-mapped and are decompressed into memory on load
+    :param min_array_bytes: Minimum size of an array to store it in a separate file
+    """
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression}, use one of {sorted(COMPRESSIONS)}")
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    (tmp_path / "arrays").mkdir(parents=True)
+
+    n_buffers = 0
+
+    def write_buffer(buffer: pickle.PickleBuffer):
+        nonlocal n_buffers
+        data = buffer.raw()
+        if data.nbytes < min_array_bytes:
+            # A true value stores the buffer in-band
+            return True
+        with open(tmp_path / "arrays" / f"{n_buffers}.bin", "wb") as f:
+            f.write(COMPRESSIONS[compression].compress(data) if compression else data)
+        n_buffers += 1
+        return False
+
+    with open(tmp_path / "object.pkl", "wb") as f:
+        pickle.dump(obj, f, protocol=5, buffer_callback=write_buffer)
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump({"n_buffers": n_buffers, "compression": compression}, f)
+
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+    os.replace(tmp_path, path)
+
+
+def load(path: str, mmap_mode: str = "r"):
+    """
+    Loads an object stored by dump
+    :param path: Directory the object was stored in
+    :param mmap_mode: "r" to memory-map the arrays read-only, "c" for copy-on-write (writes stay private
+    to the process), None to read them into memory. Compressed arrays are always read into memory
+    """
+    if mmap_mode is not None and mmap_mode not in MMAP_MODES:
+        raise ValueError(f"Unknown mmap_mode {mmap_mode}, use one of {sorted(MMAP_MODES)} or None")
+
+    path = Path(path)
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+
+    buffers = [_read_buffer(path / "arrays" / f"{i}.bin", meta["compression"], mmap_mode)
+               for i in range(meta["n_buffers"])]
+    with open(path / "object.pkl", "rb") as f:
+        return pickle.load(f, buffers=buffers)
+
+
+def _read_buffer(file_path: Path, compression: str, mmap_mode: str):
+    with open(file_path, "rb") as f:
+        if compression:
+            return bytearray(COMPRESSIONS[compression].decompress(f.read()))
+        if mmap_mode is None or os.fstat(f.fileno()).st_size == 0:
+            return bytearray(f.read())
+        return mmap.mmap(f.fileno(), 0, access=MMAP_MODES[mmap_mode])
@@ -1,10 +1,12 @@
 import logging
+import os
 import pickle
 from abc import abstractmethod
 
 from sentiment_analysis import LoggableObject
-from sentiment_analysis.data_processing import DataProcessor
+from sentiment_analysis.data_processing import DataProcessor, PipelineProcessor
 from sentiment_analysis.experimentation import Experimentation
+from sentiment_analysis.models import array_storage
 
 
 class BaseModel(LoggableObject):
@@ -24,8 +26,10 @@ class BaseModel(LoggableObject):
         :param model_name: Model name, to be used by the experiment manager
         :param experiment_logger: Experimentation service for logging model metric during training/inference.
         To be used in the model's functions, e.g. self.experimentation.log_metric("loss", loss)
-        :param preprocessor: Preprocessor object that would preprocess each input sample
-        :param postprocessor: Postprocessor object that would postprocess data after training/inference
+        :param preprocessor: Preprocessor object that would preprocess each input sample.
+        A list of processors is chained into a PipelineProcessor
+        :param postprocessor: Postprocessor object that would postprocess data after training/inference.
+        A list of processors is chained into a PipelineProcessor
         :param hyper_params: any specific parameter for the model should pass here to be logged
         into the experiment logger
         """
@@ -34,6 +38,11 @@ class BaseModel(LoggableObject):
         else:
             self.name = self.__class__.__name__
 
+        if isinstance(preprocessor, (list, tuple)):
+            preprocessor = PipelineProcessor(preprocessor)
+        if isinstance(postprocessor, (list, tuple)):
+            postprocessor = PipelineProcessor(postprocessor)
+
         self.preprocessor = preprocessor
         self.postprocessor = postprocessor
 
@@ -82,24 +91,38 @@ class BaseModel(LoggableObject):
     def __repr__(self):
         return f"Model: {self.name}"
 
-    def save(self, file_path: str):
+    def save(self, file_path: str, separate_arrays: bool = False, compression: str = None):
         """
         Stores a model in a pickle. Note that some objects are not pickable.
         In such case the save method should be overridden.
-        :param file_path: Path to pickle
+        :param file_path: Path to pickle, or to a directory if separate_arrays is True
+        :param separate_arrays: If True, large numpy arrays are stored as separate files which load memory-maps,
+        so that processes loading the same model share their pages (see array_storage)
+        :param compression: Compression of the array files (zlib, bz2 or lzma), for cold storage.
+        Implies separate_arrays. Compressed arrays are read into memory on load
         :return:
         """
+        if separate_arrays or compression:
+            array_storage.dump(self, file_path, compression=compression)
+            return
+
         with open(file_path, "wb+") as f:
             pickle.dump(self, file=f)
 
     @classmethod
-    def load(cls, file_path):
+    def load(cls, file_path, mmap_mode: str = "r"):
         """
-        Loads a model from pickle. Note that some objects are not pickable.
+        Loads a model from pickle, or from a directory written by save with separate_arrays.
+        Note that some objects are not pickable.
         In such case the load method should be overridden.
-        :param file_path: Path to pickle file
+        :param file_path: Path to pickle file or directory
+        :param mmap_mode: For separate arrays: "r" to memory-map them read-only, "c" for copy-on-write,
+        None to read them into memory
         :return: An model of type BaseModel
         """
+        if os.path.isdir(file_path):
+            return array_storage.load(file_path, mmap_mode=mmap_mode)
+
         with open(file_path, "rb") as f:
             obj = pickle.load(f)
         return obj
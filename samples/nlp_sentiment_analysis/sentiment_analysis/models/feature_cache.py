@@ -0,0 +1,93 @@
+import hashlib
+import json
+import logging
+import pickle
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from sentiment_analysis.data_processing.disk_cache import find_entry, fingerprint, load_array, store_entry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "../data/interim/feature_cache"
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+
+class FeatureCache:
+    """
+    Caches sparse feature matrices on disk together with the fitted state they were computed with
+    (e.g. a fitted vectorizer), so that experiments which only change the classifier's hyperparameters
+    skip preprocessing and featurization.
+    Matrices are stored as the raw CSR arrays (data, indices and indptr .npy files)
+    and memory-mapped back on a hit. The state is pickled.
+    When the cache exceeds max_bytes, the least recently used entries are deleted.
+    :param cache_dir: Directory to store cached features in
+    :param max_bytes: Maximum size of the cache directory
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(config: Dict, *batches) -> str:
+        """
+        Returns the cache key of featurizing batches with a configuration
+        :param config: Everything which affects the features, e.g. the preprocessor and vectorizer params
+        :param batches: Input batches, e.g. X and y, or a parent key and X
+        """
+        key = hashlib.blake2b(digest_size=20)
+        key.update(repr(sorted(config.items(), key=lambda item: str(item[0]))).encode("utf-8"))
+        for batch in batches:
+            key.update(batch.encode("utf-8") if isinstance(batch, str) else fingerprint(batch).encode("utf-8"))
+        return key.hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Tuple[sparse.csr_matrix, object]]) \
+            -> Tuple[sparse.csr_matrix, object]:
+        """
+        Returns the features and state stored under key, calling compute and storing its outputs on a miss
+        :param key: Cache key, see get_key
+        :param compute: Function returning a features matrix and a picklable state
+        :return: The features (memory-mapped on a hit) and the state
+        """
+        entry_path = find_entry(self.cache_dir, key)
+        if entry_path is not None:
+            self.hits += 1
+            logger.info(f"Loading features from cache {entry_path}")
+            return _load_entry(entry_path)
+
+        self.misses += 1
+        features, state = compute()
+        store_entry(self.cache_dir, key, lambda path: _write_entry(path, sparse.csr_matrix(features), state),
+                    self.max_bytes)
+        return features, state
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_metrics(self) -> Dict:
+        return {"feature_cache_hits": self.hits, "feature_cache_misses": self.misses}
+
+
+def _write_entry(path: Path, features: sparse.csr_matrix, state) -> None:
+    for name in ("data", "indices", "indptr"):
+        np.save(path / f"{name}.npy", getattr(features, name))
+    with open(path / "state.pkl", "wb") as f:
+        pickle.dump(state, f)
+    with open(path / "meta.json", "w") as f:
+        json.dump({"shape": list(features.shape)}, f)
+
+
+def _load_entry(path: Path) -> Tuple[sparse.csr_matrix, object]:
+    with open(path / "meta.json") as f:
+        shape = tuple(json.load(f)["shape"])
+    arrays = tuple(load_array(path / f"{name}.npy") for name in ("data", "indices", "indptr"))
+    with open(path / "state.pkl", "rb") as f:
+        state = pickle.load(f)
+    return sparse.csr_matrix(arrays, shape=shape), state
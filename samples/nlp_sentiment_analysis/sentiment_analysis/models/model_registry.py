@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Tuple
+
+from sentiment_analysis.models.base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+
+class ModelRegistry:
+    """
+    In-process LRU cache of loaded models, shared by all consumers in the process
+    (e.g. notebooks and batch jobs alternating between several models).
+    Models are loaded lazily with BaseModel.load, on the first get of their path,
+    and are reloaded when the file changes.
+    A file is identified by its modification time and size (over all files, for models saved
+    with separate arrays). With verify_hash, a changed modification time triggers a content hash,
+    and the model is only reloaded if the contents changed (e.g. not when a file is touched or copied over).
+    The size of a model is estimated by its size on disk.
+    :param max_bytes: Memory budget. The least recently used models are evicted when it is exceeded
+    :param verify_hash: Whether to compare content hashes before reloading a model whose file was modified
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, verify_hash: bool = False):
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+        self._models = OrderedDict()
+        self._names = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, file_path: str) -> None:
+        """
+        Registers a model path under a name, without loading it
+        """
+        with self._lock:
+            self._names[name] = file_path
+
+    def get(self, name_or_path: str, mmap_mode: str = "r") -> BaseModel:
+        """
+        Returns the model registered under a name, or stored in a path, loading it on a miss
+        or if its file changed since it was loaded
+        :param name_or_path: Name passed to register, or path of a model saved with BaseModel.save
+        :param mmap_mode: See BaseModel.load
+        :return: The model, shared with the other callers: it should not be modified
+        """
+        with self._lock:
+            path = os.path.realpath(self._names.get(name_or_path, name_or_path))
+            identity = file_identity(path)
+            entry = self._models.get(path)
+            if entry is not None:
+                if entry.identity == identity or (self.verify_hash and entry.digest == file_digest(path)):
+                    self.hits += 1
+                    entry.identity = identity
+                    self._models.move_to_end(path)
+                    return entry.model
+                self.reloads += 1
+                self._models.pop(path)
+            else:
+                self.misses += 1
+
+            logger.info(f"Loading model from {path}")
+            model = BaseModel.load(path, mmap_mode=mmap_mode)
+            self._put(path, _Entry(model, identity, file_digest(path) if self.verify_hash else None))
+            return model
+
+    def _put(self, path: str, entry: "_Entry") -> None:
+        if entry.size > self.max_bytes:
+            logger.info(f"Model of size {entry.size} bytes exceeds the registry budget ({self.max_bytes} bytes), "
+                        "not caching")
+            return
+
+        self._models[path] = entry
+        while self.current_bytes > self.max_bytes:
+            self._models.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(entry.size for entry in self._models.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            "model_registry_hits": self.hits,
+            "model_registry_misses": self.misses,
+            "model_registry_reloads": self.reloads,
+            "model_registry_evictions": self.evictions,
+            "model_registry_bytes": self.current_bytes,
+        }
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, name_or_path: str):
+        return os.path.realpath(self._names.get(name_or_path, name_or_path)) in self._models
+
+    def __repr__(self):
+        return f"ModelRegistry: {len(self)} models, {self.current_bytes}/{self.max_bytes} bytes"
+
+
+class _Entry:
+    def __init__(self, model: BaseModel, identity: Tuple, digest: str = None):
+        self.model = model
+        self.identity = identity
+        self.digest = digest
+        self.size = identity[1]
+
+
+def _model_files(path: str):
+    if os.path.isdir(path):
+        return sorted(file for file in Path(path).rglob("*") if file.is_file())
+    return [Path(path)]
+
+
+def file_identity(path: str) -> Tuple[int, int]:
+    """
+    Returns the latest modification time (ns) and the total size of a model file or directory
+    """
+    stats = [file.stat() for file in _model_files(path)]
+    return max(stat.st_mtime_ns for stat in stats), sum(stat.st_size for stat in stats)
+
+
+def file_digest(path: str) -> str:
+    """
+    Returns a hash of the contents of a model file or directory
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for file in _model_files(path):
+        digest.update(os.path.relpath(file, path).encode("utf-8"))
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# Process-wide registry, shared by all consumers
+model_registry = ModelRegistry()
@@ -1,35 +1,80 @@
 import logging
+from typing import Callable, Dict, Iterable, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.linear_model import SGDClassifier
 
 from sentiment_analysis.models import BaseModel
-from sentiment_analysis.data_processing import EmptyProcessor
+from sentiment_analysis.data_processing import EmptyProcessor, TokenIds
+from sentiment_analysis.data_processing.batching import shuffle_stream
+from sentiment_analysis.data_processing.dedup import Deduplicator
+from sentiment_analysis.models.feature_cache import FeatureCache
 
 
 class SentimentClassifier(BaseModel):
     """
     Example model implementation to demonstrate the approach
     Model that predicts the movie review text sentiment: is it positive or negative review.
+    If the preprocessor outputs token ids (output="token_ids"), the TF-IDF matrix is built directly from them,
+    without tokenizing the clean texts again.
+    fit_stream trains out-of-core on a stream of chunks, with stateless hashed features instead of TF-IDF.
+    With a feature cache, the fitted vectorizer and the TF-IDF matrices of fit and predict are cached on disk,
+    keyed by the preprocessor params and the data, so that runs which only change the classifier skip featurization.
     """
 
     def __init__(self, model_name='SentimentClassifier',
                  preprocessor=EmptyProcessor(),
-                 postprocessor=EmptyProcessor()
+                 postprocessor=EmptyProcessor(),
+                 dedup=False,
+                 n_features=2 ** 20,
+                 n_passes=1,
+                 shuffle_buffer_size=10000,
+                 stream_batch_size=1000,
+                 classes=(0, 1),
+                 shuffle_seed=0,
+                 feature_cache_dir=None
                  ):
         """
         :param model_name: name of model
         :param preprocessor: TextPreprocessor object for text data in this example
         :param postprocessor: TextPostprocessor object for text data in this example
+        :param dedup: If True, predict preprocesses and classifies each unique review once
+        :param n_features: fit_stream only: number of hashed features
+        :param n_passes: fit_stream only: number of passes over the stream
+        :param shuffle_buffer_size: fit_stream only: number of rows buffered for shuffling the stream
+        :param stream_batch_size: fit_stream only: number of rows per partial_fit call
+        :param classes: fit_stream only: all the labels, as partial_fit can't infer them from the first batch
+        :param shuffle_seed: fit_stream only: random seed of the shuffling
+        :param feature_cache_dir: Directory of the feature cache. If None, features are not cached
         """
 
         self.vectorizer = TfidfVectorizer()
+        self.tf_idf_transformer = TfidfTransformer()
+        self.hashing_vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+        self.n_token_ids = None
+        self.streamed = False
         self.clf = SGDClassifier()
+        self.deduplicator = Deduplicator() if dedup else None
+        self.feature_cache = FeatureCache(feature_cache_dir) if feature_cache_dir else None
+        self.feature_key = None
+        self.n_passes = n_passes
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.stream_batch_size = stream_batch_size
+        self.classes = classes
+        self.shuffle_seed = shuffle_seed
 
         super().__init__(model_name=model_name,
                          preprocessor=preprocessor,
-                         postprocessor=postprocessor)
+                         postprocessor=postprocessor,
+                         dedup=dedup,
+                         n_features=n_features,
+                         n_passes=n_passes,
+                         shuffle_buffer_size=shuffle_buffer_size,
+                         stream_batch_size=stream_batch_size,
+                         classes=classes,
+                         shuffle_seed=shuffle_seed)
 
     def fit(self, X, y=None) -> None:
         """
@@ -38,25 +83,136 @@ class SentimentClassifier(BaseModel):
         :param X: input train data list of movie reviews
         :param y: input train label sentiment for each review
         """
-        corpus = self.preprocessor.apply_batch(X)
+        self.streamed = False
+        if self.feature_cache:
+            self.feature_key = self.feature_cache.get_key(self._get_feature_config(), X, [] if y is None else y)
+            X_tf_idf, state = self.feature_cache.get_or_compute(
+                self.feature_key, lambda: (self._fit_features(X, y), self._get_feature_state()))
+            self._set_feature_state(state)
+        else:
+            X_tf_idf = self._fit_features(X, y)
+
+        logging.info("Fitting classifier")
+        self.clf.fit(X_tf_idf, y)
+
+        logging.info("Finished fitting model")
+
+    def _fit_features(self, X, y=None):
+        corpus = self.preprocessor.fit_apply_batch(X, y)
 
         logging.info("Finished preprocessing input data, fitting TF IDF vectorizer")
 
-        X_tf_idf = self.vectorizer.fit_transform(corpus)
+        if isinstance(corpus, TokenIds):
+            self.n_token_ids = int(corpus.ids.max()) + 1 if len(corpus.ids) else 0
+            return self.tf_idf_transformer.fit_transform(corpus.to_csr(self.n_token_ids))
+        return self.vectorizer.fit_transform(corpus)
 
-        logging.info("Fitting classifier")
-        self.clf.fit(X_tf_idf, y)
+    def _get_feature_config(self) -> Dict:
+        """
+        Everything which affects the TF-IDF matrices, but not the classifier's hyperparameters
+        """
+        preprocessor_class = self.preprocessor.__class__
+        return {
+            "preprocessor": f"{preprocessor_class.__module__}.{preprocessor_class.__qualname__}",
+            "preprocessor_params": self.preprocessor.get_output_params(),
+            "vectorizer_params": self.vectorizer.get_params(),
+            "tf_idf_transformer_params": self.tf_idf_transformer.get_params(),
+        }
+
+    def _get_feature_state(self) -> Dict:
+        return {
+            "vectorizer": self.vectorizer,
+            "tf_idf_transformer": self.tf_idf_transformer,
+            "n_token_ids": self.n_token_ids,
+            "preprocessor": self.preprocessor.get_fitted_state(),
+        }
+
+    def _set_feature_state(self, state: Dict) -> None:
+        self.vectorizer = state["vectorizer"]
+        self.tf_idf_transformer = state["tf_idf_transformer"]
+        self.n_token_ids = state["n_token_ids"]
+        self.preprocessor.set_fitted_state(state["preprocessor"])
+
+    def fit_stream(self, chunks: Union[Iterable, Callable[[], Iterable]], text_column: str = "text",
+                   label_column: str = "label") -> None:
+        """
+        Fits model out-of-core, keeping only the shuffle buffer and the current chunk in memory.
+        Each chunk is preprocessed with apply_batch (so the preprocessor should not need fitting),
+        its rows are shuffled through a buffer and SGDClassifier is updated with partial_fit
+        on hashed features, which need no vocabulary.
+        :param chunks: Iterable of (X, y) pairs of reviews and labels, or of DataFrame chunks
+        (e.g. NLPSampleDataLoader.iter_split), or a function returning a new such iterable for each pass.
+        With n_passes > 1 it is iterated once per pass, so it can't be a generator
+        :param text_column: Column of the reviews, for DataFrame chunks
+        :param label_column: Column of the labels, for DataFrame chunks
+        """
+        if self.n_passes > 1 and not callable(chunks) and iter(chunks) is chunks:
+            raise ValueError("An iterator can be consumed only once, "
+                             "pass a function returning the chunks for n_passes > 1")
+
+        self.streamed = True
+        self.feature_key = None
+        self.clf = SGDClassifier()
+        rng = np.random.default_rng(self.shuffle_seed)
+        classes = np.array(self.classes)
+
+        for n_pass in range(self.n_passes):
+            logging.info(f"Starting pass {n_pass + 1} of {self.n_passes} over the training stream")
+            stream = chunks() if callable(chunks) else chunks
+            corpus_chunks = ((self.__preprocess_chunk(X), y) for X, y in
+                             (_split_chunk(chunk, text_column, label_column) for chunk in stream))
+            for X_batch, y_batch in shuffle_stream(corpus_chunks, self.shuffle_buffer_size,
+                                                   self.stream_batch_size, rng):
+                self.clf.partial_fit(self.hashing_vectorizer.transform(X_batch), y_batch, classes=classes)
 
         logging.info("Finished fitting model")
 
+    def __preprocess_chunk(self, X):
+        corpus = self.preprocessor.apply_batch(X)
+        if isinstance(corpus, TokenIds):
+            raise ValueError("fit_stream hashes texts, it requires a preprocessor with output='text'")
+        return corpus
+
     def predict(self, X) -> pd.DataFrame:
         """
         Predicts movie reviews  sentiment
         :param X: list of of movie text reviews
         :return: list of sentiment value 0 or 1 for each review
         """
-        corpus = self.preprocessor.apply_batch(X)
-        Xp_tf_idf = self.vectorizer.transform(corpus)
-        y_predicted = self.clf.predict(Xp_tf_idf)
+        if self.deduplicator:
+            y_predicted = self.deduplicator.apply(self._classify, X)
+        else:
+            y_predicted = self._classify(X)
         y_predicted = self.postprocessor.apply_batch(y_predicted)
         return y_predicted
+
+    def _classify(self, X):
+        if self.feature_cache and self.feature_key:
+            key = self.feature_cache.get_key({}, self.feature_key, X)
+            Xp_tf_idf, _ = self.feature_cache.get_or_compute(key, lambda: (self._features(X), None))
+        else:
+            Xp_tf_idf = self._features(X)
+        return self.clf.predict(Xp_tf_idf)
+
+    def _features(self, X):
+        corpus = self.preprocessor.apply_batch(X)
+        if self.streamed:
+            return self.hashing_vectorizer.transform(corpus)
+        if isinstance(corpus, TokenIds):
+            return self.tf_idf_transformer.transform(corpus.to_csr(self.n_token_ids))
+        return self.vectorizer.transform(corpus)
+
+    def get_metrics(self):
+        metrics = {}
+        if self.deduplicator:
+            metrics.update(self.deduplicator.get_metrics())
+        if self.feature_cache:
+            metrics.update(self.feature_cache.get_metrics())
+        return metrics or super().get_metrics()
+
+
+def _split_chunk(chunk, text_column: str, label_column: str) -> Tuple:
+    if isinstance(chunk, pd.DataFrame):
+        return chunk[text_column], chunk[label_column]
+    X, y = chunk
+    return X, y
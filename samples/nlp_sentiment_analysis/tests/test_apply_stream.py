@@ -0,0 +1,54 @@
+import itertools
+
+import spacy
+
+from sentiment_analysis.data_processing import DataProcessor, EmptyProcessor, PipelineProcessor, ParallelProcessor
+from sentiment_analysis.data_processing.text import SpacyTextProcessor
+
+
+class UpperProcessor(DataProcessor):
+    def __init__(self):
+        self.batch_sizes = []
+        super().__init__()
+
+    def apply(self, text):
+        return text.upper()
+
+    def apply_batch(self, texts):
+        self.batch_sizes.append(len(texts))
+        return [self.apply(text) for text in texts]
+
+
+def counting_stream(counter):
+    for i in itertools.count():
+        counter.append(i)
+        yield f"text {i}"
+
+
+def test_default_apply_stream_is_lazy():
+    consumed = []
+    processor = UpperProcessor()
+    stream = processor.apply_stream(counting_stream(consumed), chunk_size=10)
+
+    assert list(itertools.islice(stream, 15)) == [f"TEXT {i}" for i in range(15)]
+    assert len(consumed) == 20
+    assert processor.batch_sizes == [10, 10]
+
+
+def test_pipeline_and_empty_processor_stream():
+    pipeline = PipelineProcessor([EmptyProcessor(), UpperProcessor()], chunk_size=4)
+    assert list(pipeline.apply_stream(iter(["a", "b", "c"]))) == ["A", "B", "C"]
+
+
+def test_parallel_stream_preserves_order():
+    processor = ParallelProcessor(UpperProcessor(), n_workers=2, chunk_size=3)
+    texts = (f"text {i}" for i in range(50))
+    assert list(processor.apply_stream(texts)) == [f"TEXT {i}" for i in range(50)]
+
+
+def test_spacy_apply_stream():
+    processor = SpacyTextProcessor(spacy_model=spacy.blank("en"))
+    texts = ["This is the 1st movie!", "Great acting"]
+
+    stream = processor.apply_stream(iter(texts))
+    assert list(stream) == processor.apply_batch(texts) == ["movie", "great acting"]
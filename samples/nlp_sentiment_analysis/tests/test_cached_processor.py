@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from sentiment_analysis.data_processing import CachedProcessor, DataProcessor, ParallelProcessor, PipelineProcessor
+from sentiment_analysis.data_processing.cached_processor import MappedStrings
+from sentiment_analysis.data_processing.text import NltkTextProcessor, TextProcessor
+
+
+class CountingTextProcessor(TextProcessor):
+    def __init__(self, **kwargs):
+        self.calls = 0
+        super().__init__(**kwargs)
+
+    def tokenize(self, text):
+        return text.split()
+
+    def apply(self, text):
+        return text.lower()
+
+    def apply_batch(self, texts):
+        self.calls += 1
+        return [self.apply(text) for text in texts]
+
+
+class SquareProcessor(DataProcessor):
+    def apply(self, x):
+        return x ** 2
+
+    def apply_batch(self, X):
+        return X ** 2
+
+
+def test_cache_hit_returns_memory_mapped_strings(tmp_path):
+    texts = pd.Series(["Great Movie", "Bad actors", "", "Ünïcode"])
+    processor = CountingTextProcessor()
+    cached = CachedProcessor(processor, cache_dir=str(tmp_path))
+
+    first = cached.apply_batch(texts)
+    second = cached.apply_batch(texts)
+
+    assert processor.calls == 1
+    assert type(first) is type(second) is MappedStrings
+    assert list(second) == list(first) == ["great movie", "bad actors", "", "ünïcode"]
+    assert cached.get_metrics() == {"transform_cache_hits": 1, "transform_cache_misses": 1}
+
+
+def test_cache_key_depends_on_params_and_data(tmp_path):
+    texts = ["a", "b"]
+    key = CachedProcessor(CountingTextProcessor(), cache_dir=str(tmp_path)).get_key(texts)
+
+    assert CachedProcessor(CountingTextProcessor(), cache_dir=str(tmp_path)).get_key(texts) == key
+    assert CachedProcessor(CountingTextProcessor(pos_to_remove=["NOUN"]), cache_dir=str(tmp_path)).get_key(texts) != key
+    assert CachedProcessor(CountingTextProcessor(), cache_dir=str(tmp_path)).get_key(["a", "c"]) != key
+
+
+def test_cached_numpy_array(tmp_path):
+    cached = CachedProcessor(SquareProcessor(), cache_dir=str(tmp_path))
+    X = np.arange(10, dtype=np.float64)
+    cached.apply_batch(X)
+    output = cached.apply_batch(X)
+
+    assert isinstance(output, np.memmap)
+    np.testing.assert_array_equal(output, X ** 2)
+
+
+def test_inputs_differing_past_printed_precision_have_different_keys(tmp_path):
+    cached = CachedProcessor(SquareProcessor(), cache_dir=str(tmp_path))
+    first = pd.DataFrame({"x": [0.1234567891, 1.0], "y": [2.0, 3.0]})
+    second = pd.DataFrame({"x": [0.1234567899, 1.0], "y": [2.0, 3.0]})
+
+    assert cached.get_key(first) != cached.get_key(second)
+    assert cached.get_key(first.values) != cached.get_key(second.values)
+    assert cached.get_key(list(first.values)) != cached.get_key(list(second.values))
+    assert cached.apply_batch(first)["x"][0] == 0.1234567891 ** 2
+    assert cached.apply_batch(second)["x"][0] == 0.1234567899 ** 2
+    assert cached.get_metrics() == {"transform_cache_hits": 0, "transform_cache_misses": 2}
+
+
+def test_cache_miss_and_hit_return_the_same_type(tmp_path):
+    for texts in (["Great Movie", "Bad actors"], []):
+        cached = CachedProcessor(CountingTextProcessor(), cache_dir=str(tmp_path))
+        miss = cached.apply_batch(texts)
+        hit = cached.apply_batch(texts)
+        assert type(miss) is type(hit)
+        assert miss[:] == hit[:]
+        assert cached.get_metrics()["transform_cache_hits"] == 1
+
+    cached = CachedProcessor(SquareProcessor(), cache_dir=str(tmp_path))
+    miss = cached.apply_batch(np.arange(3))
+    hit = cached.apply_batch(np.arange(3))
+    assert isinstance(miss, np.ndarray) and isinstance(hit, np.ndarray)
+
+
+def test_eviction_by_size(tmp_path):
+    cached = CachedProcessor(SquareProcessor(), cache_dir=str(tmp_path), max_bytes=20000)
+    for i in range(5):
+        cached.apply_batch(np.full(1000, i, dtype=np.float64))
+
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_execution_params_are_not_part_of_the_key(tmp_path):
+    texts = ["Great Movie", "Bad actors"] * 5
+    first = CachedProcessor(NltkTextProcessor(remove_stopwords=False, n_workers=1), cache_dir=str(tmp_path))
+    second = CachedProcessor(NltkTextProcessor(remove_stopwords=False, n_workers=2, chunk_size=3),
+                             cache_dir=str(tmp_path))
+
+    assert first.apply_batch(texts)[:] == second.apply_batch(texts)[:]
+    assert second.get_metrics()["transform_cache_hits"] == 1
+    assert second.get_params()["n_workers"] == 2
+
+    def pipeline_key(chunk_size=1000, n_workers=1, **options):
+        processor = NltkTextProcessor(n_workers=n_workers, **options)
+        pipeline = PipelineProcessor([ParallelProcessor(processor, n_workers=n_workers)], chunk_size=chunk_size)
+        return CachedProcessor(pipeline, cache_dir=str(tmp_path)).get_key(texts)
+
+    assert pipeline_key() == pipeline_key(chunk_size=10, n_workers=4)
+    assert pipeline_key() != pipeline_key(remove_numbers=False)
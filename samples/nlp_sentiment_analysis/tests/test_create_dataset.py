@@ -0,0 +1,16 @@
+from sentiment_analysis.data.create_dataset import create_data_frame
+
+
+def test_create_data_frame(tmp_path):
+    for label, texts in (("pos", ["great<br />movie", "loved it"]), ("neg", ["bad<br/><br />acting"])):
+        folder = tmp_path / label
+        folder.mkdir()
+        for i, text in enumerate(texts):
+            (folder / f"{i}.txt").write_text(text)
+
+    df = create_data_frame(str(tmp_path), n_workers=2, random_state=0)
+
+    assert len(df) == 3
+    assert df["label"].sum() == 2
+    assert set(df["text"]) == {"great movie", "loved it", "bad acting"}
+    assert dict(zip(df["text"], df["label"]))["bad acting"] == 0
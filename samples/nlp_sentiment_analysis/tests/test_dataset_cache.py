@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment_analysis.data import DataLoader, DatasetCache, NLPSampleDataLoader, dataset_cache
+
+
+class CountingDataLoader(DataLoader):
+    def __init__(self, dataset_name="X", dataset_version=1, n_rows=100, **data_params):
+        self.n_rows = n_rows
+        self.load_count = 0
+        super().__init__(dataset_name=dataset_name, dataset_version=dataset_version, **data_params)
+
+    def download_dataset(self) -> None:
+        pass
+
+    def get_dataset(self):
+        self.load_count += 1
+        df = pd.DataFrame({"text": ["a"] * self.n_rows, "label": np.arange(self.n_rows)})
+        return df, df["label"].to_numpy()
+
+
+def test_cache_hit_across_loader_instances():
+    dataset_cache.clear()
+    first_loader = CountingDataLoader()
+    second_loader = CountingDataLoader()
+    first_loader.get_cached_dataset()
+    df, labels = second_loader.get_cached_dataset()
+
+    assert first_loader.load_count == 1
+    assert second_loader.load_count == 0
+    assert len(df) == 100
+
+    CountingDataLoader(dataset_version=2).get_cached_dataset()
+    CountingDataLoader(lowercase=True).get_cached_dataset()
+    assert len(dataset_cache) == 3
+    dataset_cache.clear()
+
+
+def test_cached_dataset_is_read_only():
+    cache = DatasetCache()
+    loader = CountingDataLoader()
+    df, labels = cache.get_dataset(loader)
+
+    with pytest.raises(ValueError):
+        labels[0] = 10
+    df["label"] = 0
+    df = df.drop(columns="text")
+    df, labels = cache.get_dataset(loader)
+    df.loc[0, "label"] = 100
+    df["text"] = df["text"].str.upper()
+
+    df, labels = cache.get_dataset(loader)
+    assert list(df.columns) == ["text", "label"]
+    assert df["label"].sum() == labels.sum() == 4950
+
+
+def test_lru_eviction():
+    cache = DatasetCache()
+    cache.get_dataset(CountingDataLoader(dataset_name="first"))
+    cache.max_bytes = int(cache.current_bytes * 2.5)
+    cache.get_dataset(CountingDataLoader(dataset_name="second"))
+    cache.get_dataset(CountingDataLoader(dataset_name="first"))
+    cache.get_dataset(CountingDataLoader(dataset_name="third"))
+
+    assert cache.evictions == 1
+    assert cache.get_stats()["dataset_cache_hits"] == 1
+    names = [key[1] for key in cache._datasets]
+    assert not any("second" in name for name in names)
+
+
+def test_changed_files_and_data_paths_are_reloaded(tmp_path):
+    cache = DatasetCache()
+    for data_dir in ("first", "second"):
+        (tmp_path / data_dir).mkdir()
+        for split in ("imdb_train", "imdb_test"):
+            pd.DataFrame({"text": [data_dir], "label": [1]}).to_parquet(tmp_path / data_dir / f"{split}.parquet")
+
+    loader = NLPSampleDataLoader("imdb", 1.0)
+    loader.data_path = str(tmp_path / "first")
+    cache.get_dataset(loader)
+    loader.data_path = str(tmp_path / "second")
+    df_train, _ = cache.get_dataset(loader)
+    assert df_train["text"].tolist() == ["second"]
+    assert cache.misses == 2
+
+    path = tmp_path / "second" / "imdb_train.parquet"
+    pd.DataFrame({"text": ["rewritten"], "label": [0]}).to_parquet(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    df_train, _ = cache.get_dataset(loader)
+    assert df_train["text"].tolist() == ["rewritten"]
+    assert cache.misses == 3
+
+    cache.get_dataset(loader)
+    assert cache.hits == 1
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+import spacy
+
+from sentiment_analysis.data_processing.dedup import Deduplicator, unique_inverse
+from sentiment_analysis.data_processing.text import SpacyTextProcessor
+
+
+def test_unique_inverse():
+    unique, inverse = unique_inverse(pd.Series(["b", "a", "b", "c", "a"], index=[5, 4, 3, 2, 1]))
+    assert unique == ["b", "a", "c"]
+    assert inverse.tolist() == [0, 1, 0, 2, 1]
+
+
+def test_deduplicator_processes_unique_items_once():
+    batches = []
+    deduplicator = Deduplicator()
+
+    def upper(texts):
+        batches.append(texts)
+        return np.array([text.upper() for text in texts])
+
+    assert deduplicator.apply(upper, ["a", "b", "a", "a"]).tolist() == ["A", "B", "A", "A"]
+    assert batches == [["a", "b"]]
+    assert deduplicator.get_metrics() == {"dedup_ratio": 0.5}
+
+
+def test_spacy_processor_dedup():
+    texts = ["Great acting", "Bad movie!", "Great acting"]
+    processor = SpacyTextProcessor(spacy_model=spacy.blank("en"), dedup=True)
+
+    assert processor.apply_batch(texts) == SpacyTextProcessor(spacy_model=spacy.blank("en")).apply_batch(texts)
+    assert processor.get_metrics()["dedup_ratio"] == pytest.approx(1 / 3)
+    assert processor.get_params()["dedup"] is True
@@ -0,0 +1,76 @@
+import numpy as np
+
+from sentiment_analysis.data_processing import CachedProcessor, DataProcessor, PipelineProcessor
+
+
+class StandardScaler(DataProcessor):
+    def __init__(self):
+        self.fit_count = 0
+        super().__init__()
+
+    def fit(self, X, y=None):
+        self.fit_count += 1
+        self.mean_ = np.mean(X)
+        self.std_ = np.std(X)
+        return self
+
+    def apply(self, x):
+        return (x - self.mean_) / self.std_
+
+    def apply_batch(self, X):
+        return (np.asarray(X) - self.mean_) / self.std_
+
+    def get_params(self):
+        return {"processor_name": self.name}
+
+
+def test_save_and_load_fitted_state(tmp_path):
+    X = np.array([1.0, 2.0, 3.0])
+    scaler = StandardScaler().fit(X)
+    scaler.save_fitted_state(tmp_path / "scaler.pkl")
+
+    loaded = StandardScaler().load_fitted_state(tmp_path / "scaler.pkl")
+
+    assert loaded.get_fitted_state() == {"mean_": 2.0, "std_": scaler.std_}
+    np.testing.assert_array_equal(loaded.apply_batch(X), scaler.apply_batch(X))
+
+
+def test_pipeline_fits_steps_on_previous_outputs():
+    pipeline = PipelineProcessor([StandardScaler(), StandardScaler()])
+    output = pipeline.fit_apply_batch(np.array([1.0, 5.0, 9.0]))
+
+    assert pipeline.steps[1].mean_ == 0
+    np.testing.assert_allclose(output, pipeline.steps[0].apply_batch(np.array([1.0, 5.0, 9.0])))
+
+
+def test_cached_fit_is_reused_across_trials(tmp_path):
+    X = np.array([1.0, 2.0, 3.0, 4.0])
+    first_trial = CachedProcessor(StandardScaler(), cache_dir=str(tmp_path))
+    first_trial.fit(X)
+
+    second_trial = CachedProcessor(StandardScaler(), cache_dir=str(tmp_path))
+    second_trial.fit(X)
+
+    assert second_trial.processor.fit_count == 0
+    assert second_trial.processor.mean_ == 2.5
+    np.testing.assert_array_equal(second_trial.apply_batch(X), first_trial.apply_batch(X))
+
+    # Fitting on other data yields another state, and other cached outputs
+    second_trial.fit(X * 2)
+    assert second_trial.processor.fit_count == 1
+    assert second_trial.get_key(X) != first_trial.get_key(X)
+
+
+def test_large_fitted_states_have_different_keys(tmp_path):
+    first_state = {"mean_": np.zeros(5000), "std_": 1.0}
+    second_state = {"mean_": np.zeros(5000), "std_": 1.0}
+    second_state["mean_"][2500] = 1.0
+    assert repr(first_state) == repr(second_state)
+
+    cached = CachedProcessor(StandardScaler(), cache_dir=str(tmp_path))
+    cached.set_fitted_state(first_state)
+    first_key = cached.get_key(np.ones(3))
+    cached.set_fitted_state(second_state)
+    assert cached.get_key(np.ones(3)) != first_key
+    cached.set_fitted_state(first_state)
+    assert cached.get_key(np.ones(3)) == first_key
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from sentiment_analysis.models import ModelRegistry, SentimentClassifier, model_registry
+
+
+def fit_model(tmp_path, name, labels=(1, 0, 0), **save_options) -> str:
+    model = SentimentClassifier()
+    model.fit(np.array(["excellent movie", "did not like it", "horrible actors"]), np.array(labels))
+    path = str(tmp_path / name)
+    model.save(path, **save_options)
+    return path
+
+
+def test_models_are_loaded_lazily_and_once(tmp_path):
+    registry = ModelRegistry()
+    path = fit_model(tmp_path, "model.pkl")
+    registry.register("sentiment", path)
+    assert len(registry) == 0
+
+    model = registry.get("sentiment")
+    assert registry.get(path) is model
+    assert "sentiment" in registry
+    assert registry.get_stats()["model_registry_hits"] == 1
+    assert registry.get_stats()["model_registry_misses"] == 1
+    assert registry.get_stats()["model_registry_bytes"] == os.path.getsize(path)
+
+
+def test_changed_files_are_reloaded(tmp_path):
+    registry = ModelRegistry()
+    path = fit_model(tmp_path, "model", separate_arrays=True)
+    model = registry.get(path)
+
+    fit_model(tmp_path, "model", labels=(0, 1, 1), separate_arrays=True)
+    reloaded = registry.get(path)
+    assert reloaded is not model
+    assert registry.get_stats()["model_registry_reloads"] == 1
+    assert len(registry) == 1
+
+
+def test_touched_files_are_not_reloaded_with_verify_hash(tmp_path):
+    registry = ModelRegistry(verify_hash=True)
+    path = fit_model(tmp_path, "model.pkl")
+    model = registry.get(path)
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert registry.get(path) is model
+    assert registry.get_stats()["model_registry_reloads"] == 0
+
+
+def test_least_recently_used_models_are_evicted(tmp_path):
+    paths = [fit_model(tmp_path, f"model_{i}.pkl") for i in range(3)]
+    registry = ModelRegistry(max_bytes=2 * max(os.path.getsize(path) for path in paths))
+
+    registry.get(paths[0])
+    registry.get(paths[1])
+    registry.get(paths[0])
+    registry.get(paths[2])
+
+    assert paths[0] in registry and paths[2] in registry
+    assert paths[1] not in registry
+    assert registry.get_stats()["model_registry_evictions"] == 1
+
+    registry.clear()
+    assert len(registry) == 0
+
+
+def test_process_wide_registry(tmp_path):
+    model_registry.clear()
+    path = fit_model(tmp_path, "model.pkl")
+    assert model_registry.get(path) is model_registry.get(path)
+    model_registry.clear()
@@ -0,0 +1,74 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment_analysis.models import BaseModel, SentimentClassifier
+
+
+class ArrayModel(BaseModel):
+    def __init__(self, weights: np.ndarray):
+        self.weights = weights
+        self.small = np.arange(3)
+        super().__init__()
+
+    def fit(self, X, y=None) -> None:
+        pass
+
+    def predict(self, X):
+        return X @ self.weights
+
+
+def _mapped(array: np.ndarray) -> bool:
+    base = array
+    while getattr(base, "base", None) is not None:
+        base = base.base
+    return isinstance(base, memoryview) and isinstance(base.obj, mmap.mmap)
+
+
+def test_separate_arrays_are_memory_mapped(tmp_path):
+    model = ArrayModel(np.random.default_rng(0).random((100, 200)))
+    model.save(str(tmp_path / "model"), separate_arrays=True)
+
+    loaded = BaseModel.load(str(tmp_path / "model"))
+    assert np.array_equal(loaded.weights, model.weights)
+    assert _mapped(loaded.weights)
+    assert not loaded.weights.flags.writeable
+    assert np.array_equal(loaded.small, model.small)
+    assert len(list((tmp_path / "model" / "arrays").iterdir())) == 1
+
+    copy_on_write = BaseModel.load(str(tmp_path / "model"), mmap_mode="c")
+    copy_on_write.weights[0, 0] = -1
+    assert BaseModel.load(str(tmp_path / "model")).weights[0, 0] == model.weights[0, 0]
+
+    in_memory = BaseModel.load(str(tmp_path / "model"), mmap_mode=None)
+    assert not _mapped(in_memory.weights) and in_memory.weights.flags.writeable
+
+
+@pytest.mark.parametrize("compression", ["zlib", "bz2", "lzma"])
+def test_compressed_arrays(tmp_path, compression):
+    model = ArrayModel(np.zeros((100, 200)))
+    model.save(str(tmp_path / "model"), compression=compression)
+
+    assert (tmp_path / "model" / "arrays" / "0.bin").stat().st_size < model.weights.nbytes
+    assert np.array_equal(BaseModel.load(str(tmp_path / "model")).weights, model.weights)
+
+    with pytest.raises(ValueError):
+        model.save(str(tmp_path / "model"), compression="zip")
+
+
+def test_sentiment_classifier_round_trip(tmp_path):
+    X = np.array(["excellent movie", "did not like it", "horrible actors"])
+    y = np.array([1, 0, 0])
+    model = SentimentClassifier()
+    model.fit(X, y)
+
+    model.save(str(tmp_path / "pickle.pkl"))
+    model.save(str(tmp_path / "model"), separate_arrays=True)
+    model.save(str(tmp_path / "model"), separate_arrays=True)
+
+    Xp = pd.Series(["excellent actors", "horrible movie"])
+    for path in ("pickle.pkl", "model"):
+        loaded = BaseModel.load(str(tmp_path / path))
+        assert list(loaded.predict(Xp)) == list(model.predict(Xp))
@@ -2,7 +2,9 @@ import pytest
 
 import pandas as pd
 
+from sentiment_analysis.data.data_loader import DataLoader
 from sentiment_analysis.data.nlp_sample_data_loader import NLPSampleDataLoader
+from sentiment_analysis.data.sampling import SamplingSpec
 
 def test_can_load():
 
@@ -11,4 +13,79 @@ def test_can_load():
 
     x = df1['text'][198]
     
-    assert x is not None
\ No newline at end of file
+    assert x is not None
+
+def split_df(split, n_rows=50):
+    return pd.DataFrame({"text": [f"{split} {i}" for i in range(n_rows)], "label": [i % 2 for i in range(n_rows)]})
+
+
+@pytest.fixture
+def sharded_loader(tmp_path):
+    for split in ("imdb_train", "imdb_test"):
+        split_df(split).to_parquet(tmp_path / f"{split}.parquet", index=False, row_group_size=7)
+
+    my_loader = NLPSampleDataLoader("imdb", 1.0)
+    my_loader.data_path = str(tmp_path)
+    return my_loader
+
+
+@pytest.fixture
+def csv_loader(tmp_path):
+    (tmp_path / "csv").mkdir()
+    for split in ("imdb_train", "imdb_test"):
+        split_df(split).to_csv(tmp_path / "csv" / f"{split}.data", index=False)
+
+    my_loader = NLPSampleDataLoader("imdb", 1.0)
+    my_loader.data_path = str(tmp_path / "csv")
+    return my_loader
+
+
+class InMemoryDataLoader(DataLoader):
+    def download_dataset(self) -> None:
+        pass
+
+    def get_dataset(self):
+        return split_df("imdb_train"), split_df("imdb_test")
+
+
+@pytest.mark.parametrize("strategy", ["range", "hash"])
+def test_shards_are_disjoint_and_complete(sharded_loader, strategy):
+    n_shards = 3
+    shards = [sharded_loader.get_shard(i, n_shards, strategy=strategy) for i in range(n_shards)]
+
+    train_texts = [text for df_train, _ in shards for text in df_train["text"]]
+    assert sorted(train_texts) == sorted(f"imdb_train {i}" for i in range(50))
+
+    # Same shard is loaded deterministically
+    df_train, _ = sharded_loader.get_shard(1, n_shards, strategy=strategy)
+    assert df_train["text"].tolist() == shards[1][0]["text"].tolist()
+
+
+def test_invalid_shard(sharded_loader):
+    with pytest.raises(ValueError):
+        sharded_loader.get_shard(3, 3)
+
+
+@pytest.mark.parametrize("strategy", ["range", "hash"])
+@pytest.mark.parametrize("n_shards", [3, 10])
+def test_parquet_and_csv_files_give_the_same_shards(sharded_loader, csv_loader, strategy, n_shards):
+    default_loader = InMemoryDataLoader("imdb", 1.0)
+    for shard_index in range(n_shards):
+        df_train, df_test = sharded_loader.get_shard(shard_index, n_shards, strategy=strategy)
+        for loader in (csv_loader, default_loader):
+            expected_train, expected_test = loader.get_shard(shard_index, n_shards, strategy=strategy)
+            pd.testing.assert_frame_equal(df_train, expected_train)
+            pd.testing.assert_frame_equal(df_test, expected_test)
+        if strategy == "range":
+            assert len(df_train) in (50 // n_shards, 50 // n_shards + 1)
+
+
+@pytest.mark.parametrize("strategy", ["range", "hash"])
+def test_shards_of_a_sampled_loader_hold_the_sample(sharded_loader, strategy):
+    sharded_loader.sampling = SamplingSpec(n_samples=10, seed=3)
+    df_train, df_test = sharded_loader.get_dataset()
+    shards = [sharded_loader.get_shard(i, 2, strategy=strategy) for i in range(2)]
+
+    assert sum(len(shard_train) for shard_train, _ in shards) == 10
+    assert sorted(text for shard_train, _ in shards for text in shard_train["text"]) == sorted(df_train["text"])
+    assert sorted(text for _, shard_test in shards for text in shard_test["text"]) == sorted(df_test["text"])
@@ -0,0 +1,126 @@
+import random
+import re
+
+import nltk
+import pytest
+
+from sentiment_analysis.data_processing.text import NltkTextProcessor, benchmark, nltk_text_processor
+from sentiment_analysis.data_processing.text.benchmark import per_text_preprocess, synthetic_corpus
+
+# The pattern the previous NltkTextProcessor.tokenize passed to nltk.regexp_tokenize, before word_tokenize
+OLD_PATTERN = r''' (?x)
+                            (?:\w+'\w+)                            # match words separated by a '
+                            |(?:\w+(?:-\w+)+)                      # part-one; face-to-face
+                            |(?:\w\.)+                             # U.S.A. etch
+                            |(?:\w+\.\w+(?:.\w+)+)                 # 12.402.2mvdwu.10.0696cal
+                            |(?x)(?:[p%€$.]*\d+[,.]*\d*[%€$]*)     # $21.3 3.56% p0.001 456 4.5 etc.
+                            |\w+                                   # match any word
+                            |\s+                                   # spaces
+                            '''
+
+# nltk compiles patterns with the regex module, which reads the space before (?x) as a literal:
+# the apostrophe alternative only matched after a space, so words like ye'can at the start of a text or after
+# punctuation were matched in two parts and lost their apostrophe. tokenize applies the pattern as intended
+# (as re read it before Python 3.11: verbose as a whole), which only changes words joined by an apostrophe.
+# Texts with their old tokens and their tokenize tokens
+INTENDED_DIFFERENCES = [
+    ("ye'can", ["ye", "can"], ["ye'can"]),
+    ("d'N", ["d", "N"], ["d'N"]),
+    ("i'm sure", ["i", "m", "sure"], ["i", "'m", "sure"]),
+    ("it's fine", ["it", "s", "fine"], ["it", "'s", "fine"]),
+    ("o'clock", ["o", "clock"], ["o'clock"]),
+]
+
+
+def old_tokenize(text, pattern=OLD_PATTERN):
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        preserve_line = False
+    except LookupError:
+        # Single tokens are single sentences, so sentence splitting can be skipped
+        preserve_line = True
+    return [token for word in nltk.regexp_tokenize(text, pattern)
+            for token in nltk.word_tokenize(word, preserve_line=preserve_line)]
+
+
+TEXTS = [
+    "I wasn't at the U.S. premiere, but it's the best movie of 2019!!",
+    "I'm sure you'll love it... They're gonna remake it; we've seen it 3 times.",
+    "$21.3 3.56% p0.001 456 4.5 12.402.2mvdwu.10.0696cal 3,000 1,5 7. a.",
+    "face-to-face part-one gonna-be x.cannot wanna d'ye more'n can't CAN'T He'D",
+    "<br /><br />The acting (if you can call it that) was *awful* -- 1/10.",
+    "",
+    "   ",
+]
+
+
+def random_texts(n_texts, seed=0):
+    alphabet = ["a", "n", "s", "t", "d", "gonna", "more", "ye", "can", "not", "N", "T", "é", "_",
+                "0", "7", "'", "-", "--", ".", "..", ",", "$", "%", "€", "p", "!", "?", "(", ")", "\"", " ", "\n"]
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30))) for _ in range(n_texts)]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_tokenize_matches_nltk_regexp_tokenize(text):
+    processor = NltkTextProcessor()
+    assert processor.tokenize(text) == old_tokenize(text, OLD_PATTERN.lstrip())
+    assert processor.tokenize(text.lower()) == old_tokenize(text.lower(), OLD_PATTERN.lstrip())
+
+
+def test_tokenize_matches_nltk_regexp_tokenize_on_random_texts():
+    processor = NltkTextProcessor()
+    for text in random_texts(5000):
+        tokens = processor.tokenize(text)
+        assert tokens == old_tokenize(text, OLD_PATTERN.lstrip()), text
+        if tokens != old_tokenize(text):
+            assert re.search(r"\w'\w", text), text
+
+
+@pytest.mark.parametrize("text, old_tokens, tokens", INTENDED_DIFFERENCES)
+def test_tokenize_differences_from_previous_tokenizer(text, old_tokens, tokens):
+    assert old_tokenize(text) == old_tokens
+    assert NltkTextProcessor().tokenize(text) == tokens
+
+
+# Stand-ins for the NLTK tagger and stopwords corpus, which are not available in CI
+STOPWORDS = ["i", "it", "is", "the", "a", "was", "and", "of", "you", "we", "they", "'s", "n't", "ten"]
+
+
+def fake_pos_tag(tokens):
+    """
+    Tags depend on the previous token, so tagging tokens of different sentences together would change them
+    """
+    tags = ["NN", "VBD", "JJ", "NNS", "RB"]
+    return [(token, tags[(len(token) + len(previous)) % len(tags)])
+            for previous, token in zip([""] + tokens[:-1], tokens)]
+
+
+class FakeStopwords:
+    @staticmethod
+    def words(language):
+        assert language == "english"
+        return STOPWORDS
+
+
+@pytest.fixture
+def fake_nltk_data(monkeypatch):
+    monkeypatch.setattr(nltk, "pos_tag", fake_pos_tag)
+    monkeypatch.setattr(nltk, "pos_tag_sents", lambda sentences: [fake_pos_tag(tokens) for tokens in sentences])
+    monkeypatch.setattr(nltk_text_processor, "stopwords", FakeStopwords)
+    monkeypatch.setattr(benchmark, "stopwords", FakeStopwords)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"pos_to_remove": ["NN", "VB"]},
+    {"pos_to_remove": ["JJ"], "remove_numbers": False},
+    {"pos_to_remove": ["RB"], "remove_stopwords": False},
+    {"remove_numbers": False, "remove_stopwords": False},
+])
+def test_batched_preprocessing_matches_per_text(fake_nltk_data, options):
+    texts = TEXTS + synthetic_corpus(60, n_words=300)
+    expected = [per_text_preprocess(NltkTextProcessor(), text, **options) for text in texts]
+
+    assert NltkTextProcessor(chunk_size=7, **options).apply_batch(texts) == expected
+    assert [NltkTextProcessor(**options).apply(text) for text in texts] == expected
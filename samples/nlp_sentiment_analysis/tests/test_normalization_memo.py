@@ -0,0 +1,64 @@
+from sentiment_analysis.data_processing.text import NltkTextProcessor
+from sentiment_analysis.data_processing.text.normalization_memo import NormalizationMemo
+
+
+def test_memo_is_bounded_lru():
+    calls = []
+    memo = NormalizationMemo("upper", lambda token: calls.append(token) or token.upper(), max_size=2)
+
+    assert [memo(token) for token in ["a", "b", "a", "c", "b"]] == ["A", "B", "A", "C", "B"]
+    assert calls == ["a", "b", "c", "b"]
+    assert len(memo) == 2
+    assert memo.get_stats() == {"normalization_memo_hits": 1,
+                                "normalization_memo_misses": 4,
+                                "normalization_memo_hit_rate": 0.2}
+
+
+def test_memo_is_persisted(tmp_path):
+    path = tmp_path / "memo.pkl"
+    memo = NormalizationMemo("upper", str.upper, path=path)
+    memo("a")
+    memo.save()
+
+    loaded = NormalizationMemo("upper", str.upper, path=path)
+    assert loaded("a") == "A"
+    assert loaded.hits == 1
+
+    other = NormalizationMemo("lower", str.lower, path=path)
+    assert len(other) == 0
+
+
+def test_nltk_processor_stems_through_memo(tmp_path):
+    path = tmp_path / "stems.pkl"
+    processor = NltkTextProcessor(remove_stopwords=False, normalize="Stem", normalization_memo_path=path)
+
+    assert processor.apply_batch(["running runners", "running"]) == ["run runner", "run"]
+    metrics = processor.get_metrics()
+    assert metrics["normalization_memo_hits"] == 1
+    assert metrics["normalization_memo_misses"] == 2
+
+    processor = NltkTextProcessor(remove_stopwords=False, normalize="Stem", normalization_memo_path=path)
+    assert processor.apply_batch(["runners"]) == ["runner"]
+    assert processor.get_metrics()["normalization_memo_hit_rate"] == 1.0
+
+
+def test_parallel_workers_merge_their_memos(tmp_path):
+    path = tmp_path / "stems.pkl"
+    texts = [f"running runners {word}ing walked" for word in ["jump", "talk", "play", "sing"] * 10]
+    serial = NltkTextProcessor(remove_stopwords=False, normalize="Stem")
+    expected = serial.apply_batch(texts)
+
+    processor = NltkTextProcessor(remove_stopwords=False, normalize="Stem", n_workers=2, chunk_size=5,
+                                  normalization_memo_path=path)
+    assert processor.apply_batch(texts) == expected
+
+    # Stats and entries of all the workers are merged into the parent's memo, which is saved once
+    metrics = processor.get_metrics()
+    assert metrics["normalization_memo_hits"] + metrics["normalization_memo_misses"] == 4 * len(texts)
+    assert metrics["normalization_memo_hits"] > 0
+    assert len(processor.normalization_memo) == len(serial.normalization_memo) == 7
+
+    # str.upper would only be called on a miss
+    loaded = NormalizationMemo("porter_stem", str.upper, path=path)
+    assert len(loaded) == 7
+    assert [loaded(token) for token in ["running", "walked", "singing"]] == ["run", "walk", "sing"]
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+
+from sentiment_analysis.data_processing import (
+    CachedProcessor, DataProcessor, EmptyProcessor, ParallelProcessor, PipelineProcessor
+)
+
+
+class PidProcessor(DataProcessor):
+    """
+    Returns each item along with the id of the process which processed it
+    """
+
+    def apply(self, x):
+        return x, os.getpid()
+
+    def apply_batch(self, X):
+        return [self.apply(x) for x in X]
+
+
+def test_parallel_apply_batch_preserves_order():
+    processor = ParallelProcessor(PidProcessor(), n_workers=2, chunk_size=10)
+    outputs = processor.apply_batch(list(range(95)))
+
+    assert [x for x, _ in outputs] == list(range(95))
+    assert os.getpid() not in {pid for _, pid in outputs}
+
+
+def test_parallel_apply_batch_numpy():
+    processor = ParallelProcessor(EmptyProcessor(), n_workers=2, chunk_size=10)
+    X = np.arange(100)
+
+    np.testing.assert_array_equal(processor.apply_batch(X), X)
+
+
+def test_small_batch_runs_in_process():
+    processor = ParallelProcessor(PidProcessor(), n_workers=2, chunk_size=10)
+    outputs = processor.apply_batch(list(range(5)))
+
+    assert {pid for _, pid in outputs} == {os.getpid()}
+    assert processor.get_params() == {"name": "PidProcessor", "parallel_n_workers": 2, "parallel_chunk_size": 10}
+
+
+class CountingProcessor(DataProcessor):
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        super().__init__()
+
+    def apply(self, x):
+        return x
+
+    def apply_batch(self, X):
+        self.calls += 1
+        self.items += len(X)
+        return list(X)
+
+    def get_metrics(self):
+        return {"calls": self.calls, "items": self.items}
+
+    def take_metric_counts(self):
+        counts = {"calls": self.calls, "items": self.items}
+        self.calls = 0
+        self.items = 0
+        return counts
+
+    def merge_metric_counts(self, counts):
+        self.calls += counts["calls"]
+        self.items += counts["items"]
+
+
+def test_worker_metrics_are_merged(tmp_path):
+    counting = CountingProcessor()
+    counting.apply_batch([0, 1])
+    cached = CachedProcessor(PipelineProcessor([counting], chunk_size=5), cache_dir=str(tmp_path))
+    processor = ParallelProcessor(cached, n_workers=2, chunk_size=10)
+
+    assert processor.apply_batch(list(range(95))) == list(range(95))
+    assert list(processor.apply_stream(range(30), chunk_size=10)) == list(range(30))
+
+    # 10 chunks of up to 10 items, run by the pipeline in chunks of up to 5 items.
+    # The chunks of the stream are the first 3 chunks of the batch, so they are served from the cache
+    assert counting.get_metrics() == {"calls": 1 + 19, "items": 2 + 95}
+    metrics = processor.get_metrics()
+    assert metrics["transform_cache_misses"] == 10
+    assert metrics["transform_cache_hits"] == 3
+    assert metrics["0.CountingProcessor.items_per_second"] > 0
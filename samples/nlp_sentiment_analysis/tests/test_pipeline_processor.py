@@ -0,0 +1,56 @@
+import pandas as pd
+
+from sentiment_analysis.data_processing import DataProcessor, EmptyProcessor, PipelineProcessor
+from sentiment_analysis.models import SentimentClassifier
+
+
+class LowercaseProcessor(DataProcessor):
+    def __init__(self):
+        self.max_chunk_length = 0
+        super().__init__()
+
+    def apply(self, text):
+        return text.lower()
+
+    def apply_batch(self, texts):
+        self.max_chunk_length = max(self.max_chunk_length, len(texts))
+        return [self.apply(text) for text in texts]
+
+
+class StripProcessor(DataProcessor):
+    def apply(self, text):
+        return text.strip()
+
+    def apply_batch(self, texts):
+        return [self.apply(text) for text in texts]
+
+
+def test_pipeline_runs_all_steps_in_chunks():
+    lowercase = LowercaseProcessor()
+    pipeline = PipelineProcessor([lowercase, StripProcessor()], chunk_size=4)
+    texts = pd.Series([f" Text {i} " for i in range(10)])
+
+    assert pipeline.apply_batch(texts) == [f"text {i}" for i in range(10)]
+    assert pipeline.apply(" ABC ") == "abc"
+    assert lowercase.max_chunk_length == 4
+
+    metrics = pipeline.get_metrics()
+    assert "0.LowercaseProcessor.items_per_second" in metrics
+    assert "1.StripProcessor.items_per_second" in metrics
+
+
+def test_pipeline_params():
+    pipeline = PipelineProcessor([EmptyProcessor(), LowercaseProcessor()])
+    params = pipeline.get_params()
+
+    assert params["pipeline_steps"] == "EmptyProcessor -> LowercaseProcessor"
+    assert params["0.EmptyProcessor.processor_name"] == "EmptyProcessor"
+    assert params["1.LowercaseProcessor.max_chunk_length"] == 0
+
+
+def test_model_chains_list_of_preprocessors():
+    model = SentimentClassifier(preprocessor=[LowercaseProcessor(), StripProcessor()])
+
+    assert isinstance(model.preprocessor, PipelineProcessor)
+    model.fit(["Great movie ", "BAD movie", " great acting"], [1, 0, 1])
+    assert len(model.predict(["GREAT"])) == 1
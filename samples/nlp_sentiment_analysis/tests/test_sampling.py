@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from sentiment_analysis.data import SamplingSpec, NLPSampleDataLoader
+
+
+def make_chunks(n_rows=1000, chunk_size=64):
+    df = pd.DataFrame({"text": [f"review {i}" for i in range(n_rows)], "label": [i % 4 == 0 for i in range(n_rows)]})
+    return [df.iloc[i:i + chunk_size] for i in range(0, n_rows, chunk_size)]
+
+
+def test_reservoir_sample():
+    spec = SamplingSpec(n_samples=100, seed=1)
+    sample = spec.sample(make_chunks())
+
+    assert len(sample) == 100
+    assert sample["text"].is_unique
+    assert sample["label"].dtype == bool
+    # The sample should not be biased towards the first rows
+    assert sample["text"].str.split().str[1].astype(int).max() > 500
+    # Same seed yields the same sample
+    assert sample.equals(SamplingSpec(n_samples=100, seed=1).sample(make_chunks()))
+
+
+def test_reservoir_larger_than_data():
+    sample = SamplingSpec(n_samples=100).sample(make_chunks(n_rows=30))
+    assert len(sample) == 30
+
+
+def test_stratified_sample():
+    sample = SamplingSpec(n_samples=50, stratify_by="label").sample(make_chunks())
+
+    assert sample["label"].value_counts().to_dict() == {True: 50, False: 50}
+
+
+def test_fraction_sample():
+    sample = SamplingSpec(fraction=0.1, seed=3).sample(make_chunks(n_rows=10000))
+    assert 800 < len(sample) < 1200
+
+
+def test_invalid_spec():
+    with pytest.raises(ValueError):
+        SamplingSpec(fraction=0.1, n_samples=10)
+    with pytest.raises(ValueError):
+        SamplingSpec(fraction=0.1, stratify_by="label")
+
+
+def test_loader_sampling(tmp_path):
+    df = pd.DataFrame({"text": [f"review {i}" for i in range(500)], "label": [i % 2 for i in range(500)]})
+    for split in ("imdb_train", "imdb_test"):
+        df.to_parquet(tmp_path / f"{split}.parquet", index=False)
+
+    spec = SamplingSpec(n_samples=20, stratify_by="label", seed=7)
+    my_loader = NLPSampleDataLoader("imdb", 1.0, sampling=spec)
+    my_loader.data_path = str(tmp_path)
+    my_loader.chunk_size = 32
+    df_train, df_test = my_loader.get_dataset()
+
+    assert len(df_train) == 40
+    assert len(df_test) == 40
+    params = my_loader.get_params()
+    assert params["sample_n_samples"] == 20
+    assert params["sample_stratify_by"] == "label"
+    assert params["sample_seed"] == 7
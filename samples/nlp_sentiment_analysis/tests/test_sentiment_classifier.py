@@ -1,8 +1,15 @@
 import pytest
 
+import numpy as np
 import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.linear_model import SGDClassifier
 
+from sentiment_analysis.data import NLPSampleDataLoader
+from sentiment_analysis.models.feature_cache import FeatureCache
 from sentiment_analysis.models.sentiment_classifier import SentimentClassifier
+from sentiment_analysis.data_processing.batching import shuffle_stream
 from sentiment_analysis.data_processing.text import SpacyTextProcessor
 
 
@@ -54,3 +61,97 @@ def test_sentiment_classifier_can_fit_with_spacy_preprocessor(mock_train_df):
     model.fit(X, y)
 
     assert pytest.approx(model.clf.coef_[0][0], 0.001) == -6.93
+
+
+def test_sentiment_classifier_dedup_predict(mock_train_df):
+    model = SentimentClassifier(dedup=True)
+    model.fit(mock_train_df["text"].values, mock_train_df["label"].values)
+    Xp = pd.Series(["excellent movie", "horrible actors", "excellent movie", "excellent movie"])
+
+    y = model.predict(Xp)
+
+    assert list(y) == [1, 0, 1, 1]
+    assert model.get_metrics() == {"dedup_ratio": 0.5}
+    assert model.get_params()["dedup"] is True
+
+
+def test_sentiment_classifier_fit_stream(mock_train_df):
+    X = mock_train_df["text"].values
+    y = mock_train_df["label"].values
+    chunks = [(X[:2], y[:2]), (X[2:], y[2:])]
+    model = SentimentClassifier(n_passes=20, shuffle_buffer_size=2, stream_batch_size=2)
+
+    model.fit_stream(chunks)
+
+    assert model.clf.coef_.shape == (1, 2 ** 20)
+    assert list(model.predict(X)) == [1, 0, 0]
+
+    with pytest.raises(ValueError):
+        model.fit_stream(iter(chunks))
+
+
+def test_shuffle_stream_emits_each_row_once():
+    chunks = [(list(range(start, start + 7)), [0] * 7) for start in range(0, 70, 7)]
+
+    batches = list(shuffle_stream(chunks, buffer_size=10, batch_size=4, rng=np.random.default_rng(0)))
+
+    rows = [row for X, _ in batches for row in X]
+    assert sorted(rows) == list(range(70))
+    assert rows != list(range(70))
+    assert all(len(X) == 4 for X, _ in batches[:-1])
+
+
+def test_sentiment_classifier_feature_cache(mock_train_df, mock_test_df, tmp_path):
+    X = mock_train_df["text"].values
+    y = mock_train_df["label"].values
+    Xp = mock_test_df["text"].values
+    model = SentimentClassifier(feature_cache_dir=str(tmp_path))
+    model.fit(X, y)
+    expected = model.predict(Xp)
+    assert model.get_metrics() == {"feature_cache_hits": 0, "feature_cache_misses": 2}
+
+    # A classifier with other hyperparameters reuses the fitted vectorizer and both matrices
+    model = SentimentClassifier(feature_cache_dir=str(tmp_path))
+    model.clf = SGDClassifier(alpha=0.001)
+    model.fit(X, y)
+    model.predict(Xp)
+    assert model.get_metrics() == {"feature_cache_hits": 2, "feature_cache_misses": 0}
+    assert model.vectorizer.vocabulary_ == TfidfVectorizer().fit(X).vocabulary_
+
+    model = SentimentClassifier(feature_cache_dir=str(tmp_path))
+    model.fit(X, y)
+    assert list(model.predict(Xp)) == list(expected)
+
+    model = SentimentClassifier(feature_cache_dir=str(tmp_path))
+    model.fit(X[:2], y[:2])
+    assert model.get_metrics() == {"feature_cache_hits": 0, "feature_cache_misses": 1}
+
+
+def test_feature_cache_eviction_by_size(tmp_path):
+    cache = FeatureCache(cache_dir=str(tmp_path), max_bytes=30000)
+    for i in range(5):
+        cache.get_or_compute(str(i), lambda: (sparse.csr_matrix(np.full((100, 10), i + 1.0)), None))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["3", "4"]
+    features, _ = cache.get_or_compute("4", lambda: None)
+    np.testing.assert_array_equal(features.toarray(), np.full((100, 10), 5.0))
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "csv"])
+def test_sentiment_classifier_fit_stream_from_data_loader(tmp_path, file_format):
+    reviews = ["excellent movie", "did not like it", "horrible actors", "excellent actors", "great acting",
+               "bad plot"]
+    labels = [1, 0, 0, 1, 1, 0]
+    df = pd.DataFrame({"text": reviews * 10, "label": labels * 10})
+    if file_format == "parquet":
+        df.to_parquet(tmp_path / "imdb_train.parquet", index=False)
+    else:
+        df.to_csv(tmp_path / "imdb_train.data", index=False)
+    loader = NLPSampleDataLoader("imdb", 1.0)
+    loader.data_path = str(tmp_path)
+    loader.chunk_size = 7
+
+    model = SentimentClassifier(n_passes=5, shuffle_buffer_size=10, stream_batch_size=8)
+    model.fit_stream(lambda: loader.iter_split("imdb_train"))
+
+    assert list(model.predict(np.array(reviews))) == labels
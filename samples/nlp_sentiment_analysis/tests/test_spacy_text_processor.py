@@ -0,0 +1,73 @@
+import pytest
+import spacy
+from spacy.language import Language
+
+from sentiment_analysis.data_processing.text import SpacyTextProcessor
+from sentiment_analysis.data_processing.text.benchmark import per_token_clean, synthetic_corpus
+
+calls = []
+
+
+@Language.component("record_calls")
+def record_calls(doc):
+    calls.append(doc.text)
+    return doc
+
+
+def create_model(*pipes):
+    model = spacy.blank("en")
+    for pipe in pipes:
+        model.add_pipe("record_calls", name=pipe)
+    return model
+
+
+def test_runs_only_required_pipes():
+    model = create_model("tok2vec", "tagger", "parser", "ner")
+
+    processor = SpacyTextProcessor(spacy_model=model)
+    calls.clear()
+    assert processor.apply_batch(["Great acting"]) == ["great acting"]
+    assert calls == []
+    assert processor.get_params()["spacy_pipes"] == ""
+
+    processor = SpacyTextProcessor(spacy_model=model, pos_to_remove=["NOUN"])
+    calls.clear()
+    processor.apply_batch(["Great acting"])
+    assert calls == ["Great acting", "Great acting"]
+    assert processor.get_params()["spacy_pipes"] == "tok2vec,tagger"
+
+
+def test_multiprocess_apply_batch():
+    texts = [f"This is movie number {i}!" for i in range(40)]
+    serial = SpacyTextProcessor(spacy_model=spacy.blank("en"))
+    parallel = SpacyTextProcessor(spacy_model=spacy.blank("en"), n_process=2, batch_size=8)
+
+    assert parallel.apply_batch(texts) == serial.apply_batch(texts)
+    assert parallel.get_params()["n_process"] == 2
+    assert parallel.get_params()["batch_size"] == 8
+
+
+@Language.component("fake_tagger")
+def fake_tagger(doc):
+    for token in doc:
+        token.pos_ = "NOUN" if len(token.text) % 2 else "VERB"
+        token.lemma_ = token.text[::-1]
+    return doc
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"remove_numbers": False, "remove_stopwords": False},
+    {"pos_to_remove": ["NOUN"]},
+    {"pos_to_remove": ["VERB", "NN"], "normalize": "Lemmatize"},
+])
+def test_clean_matches_token_by_token_clean(options):
+    model = spacy.blank("en")
+    model.add_pipe("fake_tagger", name="tagger")
+    texts = synthetic_corpus(200, n_words=500) + ["", " ", "Café naïve — “quoted” (10 $) it's"]
+
+    processor = SpacyTextProcessor(spacy_model=model, **options)
+    expected = [per_token_clean(doc, **options) for doc in model.pipe(texts)]
+
+    assert processor.apply_batch(texts) == expected
+    assert [processor.apply(text) for text in texts] == expected
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import spacy
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from sentiment_analysis.data_processing import CachedProcessor, PipelineProcessor, TokenIds
+from sentiment_analysis.data_processing.text import NltkTextProcessor, SpacyTextProcessor
+from sentiment_analysis.models.sentiment_classifier import SentimentClassifier
+
+TEXTS = ["This is the 1st movie, great acting!", "Bad movie", "", "Great great movie... (really)"]
+
+
+def test_token_ids_batch_operations():
+    token_ids = TokenIds.from_lists([[0, 1], [2], [], [1, 1, 3]])
+
+    assert len(token_ids) == 4
+    assert token_ids[3].tolist() == [1, 1, 3]
+    assert [ids.tolist() for ids in token_ids[1:3]] == [[2], []]
+    assert [ids.tolist() for ids in token_ids.take([3, 0, 3])] == [[1, 1, 3], [0, 1], [1, 1, 3]]
+    assert [ids.tolist() for ids in TokenIds.concat([token_ids[2:], token_ids[:1]])] == [[], [1, 1, 3], [0, 1]]
+    assert token_ids[2:].to_csr(3).toarray().tolist() == [[0, 0, 0], [0, 2, 0]]
+
+
+@pytest.mark.parametrize("processor_class", [
+    lambda **kwargs: SpacyTextProcessor(spacy_model=spacy.blank("en"), **kwargs),
+    lambda **kwargs: NltkTextProcessor(remove_stopwords=False, **kwargs),
+])
+def test_token_ids_match_clean_texts(processor_class):
+    texts = processor_class().apply_batch(TEXTS)
+    processor = processor_class(output="token_ids")
+
+    with pytest.raises(ValueError):
+        processor.apply_batch(TEXTS)
+
+    token_ids = processor.fit_apply_batch(TEXTS[:2])
+    assert token_ids.decode(processor.get_tokens()) == [" ".join(text.split()) for text in texts[:2]]
+
+    # Tokens unknown to the vocabulary built by fit are dropped
+    assert processor.apply_batch(TEXTS[1:]).decode(processor.get_tokens()) == ["bad movie", "", "great great movie"]
+    assert processor.apply("Great movie").tolist() == processor.apply_batch(["Great movie"])[0].tolist()
+
+
+def test_sentiment_classifier_fits_on_token_ids():
+    X = ["excellent movie", "did not like it", "horrible actors", "excellent actors"]
+    y = np.array([1, 0, 0, 1])
+    preprocessor = SpacyTextProcessor(spacy_model=spacy.blank("en"), remove_stopwords=False, output="token_ids")
+    model = SentimentClassifier(preprocessor=preprocessor)
+    model.fit(X, y)
+
+    tokens = preprocessor.get_tokens()
+    assert model.n_token_ids == len(tokens)
+    assert model.predict(["excellent movie", "unknown words"]).shape == (2,)
+
+    # Same TF-IDF matrix as vectorizing the clean texts, up to the order of the columns
+    vectorizer = TfidfVectorizer(analyzer=str.split)
+    expected = vectorizer.fit_transform(SpacyTextProcessor(spacy_model=spacy.blank("en"), remove_stopwords=False)
+                                        .apply_batch(X))
+    tf_idf = model.tf_idf_transformer.transform(preprocessor.apply_batch(X).to_csr(model.n_token_ids))
+    columns = [vectorizer.vocabulary_[token] for token in tokens]
+    assert np.allclose(tf_idf.toarray(), expected.toarray()[:, columns])
+
+
+def test_cached_processor_stores_token_ids(tmp_path):
+    processor = CachedProcessor(SpacyTextProcessor(spacy_model=spacy.blank("en"), output="token_ids"),
+                                cache_dir=str(tmp_path))
+    expected = processor.fit_apply_batch(TEXTS, None)
+
+    processor.hits = 0
+    output = processor.apply_batch(TEXTS)
+    assert processor.hits == 1
+    assert isinstance(output, TokenIds)
+    assert [ids.tolist() for ids in output] == [ids.tolist() for ids in expected]
+
+    # Chunked outputs are concatenated back into a single batch
+    pipeline = PipelineProcessor([processor], chunk_size=2)
+    assert [ids.tolist() for ids in pipeline.apply_batch(TEXTS)] == [ids.tolist() for ids in expected]
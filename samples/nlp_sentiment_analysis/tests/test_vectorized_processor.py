@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentiment_analysis.data_processing import DataProcessor, VectorizedProcessor
+
+
+class RowProcessor(DataProcessor):
+    """
+    Implements only apply, for one row, and counts its calls
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.calls = 0
+        super().__init__()
+
+    def apply(self, row):
+        self.calls += 1
+        return self.function(row)
+
+    def apply_batch(self, X):
+        raise NotImplementedError()
+
+
+def test_numeric_apply_runs_vectorized():
+    processor = RowProcessor(lambda row: row["a"] * 2 + np.log1p(row["b"]))
+    vectorized = VectorizedProcessor(processor, n_workers=1)
+    df = pd.DataFrame({"a": np.arange(1000.0), "b": np.arange(1000.0)})
+
+    output = vectorized.apply_batch(df)
+
+    np.testing.assert_allclose(output, df["a"] * 2 + np.log1p(df["b"]))
+    # one vectorized call plus the probe rows
+    assert processor.calls == 9
+    assert vectorized.get_metrics() == {"vectorized": 1}
+
+
+def test_non_vectorizable_apply_falls_back_to_row_loop():
+    processor = RowProcessor(lambda text: text.lower().strip())
+    vectorized = VectorizedProcessor(processor, n_workers=2, chunk_size=10)
+    texts = [f" Text {i}" for i in range(25)]
+
+    assert vectorized.apply_batch(texts) == [f"text {i}" for i in range(25)]
+    assert vectorized.get_metrics() == {"vectorized": 0}
+
+
+def test_branching_apply_falls_back_to_row_loop():
+    # Python branching on a value can't be vectorized, numpy raises on the truth value of an array
+    processor = RowProcessor(lambda x: x if x > 0 else 0)
+    vectorized = VectorizedProcessor(processor, n_workers=1)
+
+    np.testing.assert_array_equal(vectorized.apply_batch(np.array([-1, 2, -3])), [0, 2, 0])
+
+
+@pytest.mark.parametrize("function, vectorized_metric", [
+    (lambda x: x * 2, 1),
+    (lambda x: x * 2 if x > 0 else 0, 0),
+])
+def test_output_has_the_input_container_type_on_both_paths(function, vectorized_metric):
+    vectorized = VectorizedProcessor(RowProcessor(function), n_workers=1)
+
+    assert vectorized.apply_batch([1, 2, 3]) == [2, 4, 6]
+    assert vectorized.get_metrics() == {"vectorized": vectorized_metric}
+    output = vectorized.apply_batch(np.array([1, 2]))
+    assert type(output) is np.ndarray and output.tolist() == [2, 4]
+    output = vectorized.apply_batch(pd.Series([1, 2], index=[5, 6]))
+    assert type(output) is pd.Series and output.to_dict() == {5: 2, 6: 4}
+    assert vectorized.apply_batch([]) == []
+
+
+def test_every_batch_is_probed():
+    processor = RowProcessor(lambda x: x * 2)
+    vectorized = VectorizedProcessor(processor, n_workers=1)
+
+    assert vectorized.apply_batch([1, 2]) == [2, 4]
+    assert vectorized.get_metrics() == {"vectorized": 1}
+
+    # Vectorized, the lists would be multiplied element-wise
+    assert vectorized.apply_batch([[1], [2]]) == [[1, 1], [2, 2]]
+    assert vectorized.get_metrics() == {"vectorized": 0}
+
+    # Once a batch fell back to the row loop, the following batches are not vectorized
+    calls = processor.calls
+    assert vectorized.apply_batch([3, 4]) == [6, 8]
+    assert processor.calls == calls + 2